@@ -0,0 +1,184 @@
+import json
+import logging
+import time
+
+from page_loading import selector_to_css
+
+####################
+# CONFIGURATION
+####################
+
+# Order of the raw fields in each row the extraction script returns
+ROW_FIELDS = ('title', 'href', 'date_text', 'image', 'locations', 'details')
+
+
+####################
+# EXTRACTION PLANS
+####################
+
+def tag_css(tag, attrs=None):
+    if isinstance(tag, dict):
+        tag = next(iter(tag), None)  # some entries give the tag as a {tag: attrs} selector
+    return selector_to_css({tag: attrs or {}}) if tag else None
+
+
+def has_matcher(value):
+    """Callables (e.g. href=lambda ...) only work in BeautifulSoup and can't be sent to the page"""
+    if callable(value):
+        return True
+    if isinstance(value, dict):
+        return any(has_matcher(entry) for entry in value.values())
+    return False
+
+
+def image_plan(img_config):
+    if not img_config:
+        return None
+    method = img_config.get('parse_method')
+    if method == 'lazy-src':
+        return {"method": method, "selector": selector_to_css(img_config)}
+    plan = {"method": method, "container": selector_to_css(img_config.get('container'))}
+    if method == 'style_background':
+        return plan
+    return {**plan, "tag": img_config.get('tag'), "attr": img_config.get('attr')}
+
+
+def compile_extraction_plan(config):
+    """Turn a SITES entry's selectors into the CSS plan the in-page script runs, or None if they can't be"""
+    if has_matcher(config):
+        return None
+    date_config = config.get('date', {})
+    url_config = config.get('event_url', {})
+    location = dict(config.get('location', {}))
+    location_parent = location.pop('parent', {}).get('class')
+    return {
+        "shadowHosts": config.get("shadow_selectors", []),
+        "deep": bool(config.get("shadow")),
+        "container": selector_to_css(config.get('content_list_class')),
+        "item": selector_to_css(config.get('item_attr')),
+        "title": selector_to_css(config.get('title')),
+        "urlMethod": url_config.get('parse_method'),
+        "url": tag_css(url_config.get('tag'), url_config.get('attrs')),
+        "date": tag_css(date_config.get('tag'), date_config.get('attrs') if date_config.get('extract_method') == "attrs" else None),
+        "image": image_plan(config.get('img', {})),
+        "location": selector_to_css(location),
+        "locationParent": tag_css('div', {"class": location_parent}) if location_parent else None,
+        "details": selector_to_css(config.get('details')),
+    }
+
+
+####################
+# IN-PAGE EXTRACTION
+####################
+
+# Reads every field of every item in one webdriver round trip and returns compact rows of raw strings
+# (see ROW_FIELDS), mirroring what the BeautifulSoup extract_* functions read from page_source.
+# With "shadow" the queries also descend into open shadow roots; "shadow_selectors" walks a host chain first.
+EXTRACT_SCRIPT = """
+const plan = arguments[0];
+
+function queryAll(root, sel) {
+    if (!sel) return [];
+    const found = Array.from(root.querySelectorAll(sel));
+    if (plan.deep) {
+        for (const el of root.querySelectorAll('*')) {
+            if (el.shadowRoot) found.push(...queryAll(el.shadowRoot, sel));
+        }
+    }
+    return found;
+}
+const query = (root, sel) => root && sel ? queryAll(root, sel)[0] || null : null;
+const text = el => el ? el.textContent.trim() : null;
+const attr = (el, name) => el && name ? el.getAttribute(name) : null;
+
+// same as ' '.join(element.stripped_strings)
+function strings(el) {
+    if (!el) return null;
+    const parts = [];
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const part = walker.currentNode.nodeValue.trim();
+        if (part) parts.push(part);
+    }
+    return parts.join(' ');
+}
+
+function image(item) {
+    const spec = plan.image;
+    if (!spec) return null;
+    if (spec.method === 'lazy-src') {
+        const img = query(item, spec.selector);
+        return img ? attr(img, 'data-lazy-src') || attr(img, 'src') : null;
+    }
+    const container = query(item, spec.container);
+    if (spec.method === 'style_background') return attr(container, 'style');
+    return attr(query(container, spec.tag), spec.attr);
+}
+
+function href(item, titleEl) {
+    if (plan.urlMethod === 'title') {
+        if (!titleEl) return null;
+        return attr(titleEl, 'href') || attr(titleEl.querySelector('a'), 'href') || '';
+    }
+    if (plan.urlMethod === 'tag') return attr(query(item, plan.url), 'href');
+    return null;
+}
+
+let root = document;
+for (const host of plan.shadowHosts) {
+    const el = query(root, host);
+    root = el && el.shadowRoot;
+    if (!root) return null;
+}
+const container = plan.container ? query(root, plan.container) : root;
+if (!container) return null;
+
+return queryAll(container, plan.item).map(item => {
+    const titleEl = query(item, plan.title);
+    const link = titleEl && (titleEl.tagName === 'A' ? titleEl : titleEl.querySelector('a'));
+    const locationRoot = plan.locationParent ? query(item, plan.locationParent) : item;
+    return [
+        link ? text(link) : text(titleEl),
+        href(item, titleEl),
+        text(query(item, plan.date)),
+        image(item),
+        locationRoot && plan.location ? queryAll(locationRoot, plan.location).map(text) : [],
+        strings(query(item, plan.details)),
+    ];
+});
+"""
+
+
+def extract_in_browser(driver, config):
+    """Raw field rows for every item on the loaded page, or None when the content list isn't there"""
+    plan = compile_extraction_plan(config)
+    if plan is None:
+        logging.info(f"Selectors use BeautifulSoup-only matchers, skipping in-browser extraction: {driver.current_url}")
+        return None
+    start = time.perf_counter()
+    try:
+        rows = driver.execute_script(EXTRACT_SCRIPT, plan)
+    except Exception as e:
+        logging.error(f"In-browser extraction failed for {driver.current_url}: {e}")
+        return None
+    if rows is None:
+        logging.info(f"In-browser extraction found no content list: {driver.current_url}")
+        return None
+    logging.info(f"In-browser extraction read {len(rows)} items ({len(json.dumps(rows)) / 1024:.0f} KB) "
+                 f"in {(time.perf_counter() - start) * 1000:.0f} ms: {driver.current_url}")
+    return [dict(zip(ROW_FIELDS, row)) for row in rows]
+
+
+# The page's schema.org blocks, so a browser-read site still gets JSON-LD events without its page_source
+JSONLD_SCRIPT = """
+return Array.from(document.querySelectorAll('script[type="application/ld+json"]'), script => script.textContent);
+"""
+
+
+def jsonld_in_browser(driver):
+    """Text of every application/ld+json script on the loaded page"""
+    try:
+        return driver.execute_script(JSONLD_SCRIPT) or []
+    except Exception as e:
+        logging.error(f"Reading JSON-LD in the browser failed for {driver.current_url}: {e}")
+        return []
@@ -0,0 +1,255 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import chromedriver_autoinstaller
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+####################
+# CONFIGURATION
+####################
+
+BROWSER_POOL_SIZE = 1         # number of long-lived Chrome sessions
+BROWSER_MAX_PAGES = 50        # recycle a session after this many page loads
+BROWSER_CHECKOUT_TIMEOUT = 300  # seconds to wait for a free session
+
+# Put on the idle queue when a session is quit, so a thread waiting in checkout wakes up and starts a new one
+SLOT_FREED = None
+
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "chattanooga_events", "chromedriver.json")
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+
+def default_options(headless=True):
+    """Chrome options shared by every pooled session"""
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # network events feed the request blocking report
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+####################
+# DRIVER RESOLUTION
+####################
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def _chrome_binary():
+    """Path of the installed Chrome binary, if it is on PATH"""
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return os.path.realpath(path)
+    return None
+
+
+def _load_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_driver_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+        with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        logging.warning(f"Could not write chromedriver cache: {e}")
+
+
+def resolve_driver_path():
+    """Resolve chromedriver once per process, keyed on disk by Chrome version"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path:
+            return _driver_path
+
+        start = time.perf_counter()
+        cache = _load_driver_cache()
+        versions = cache.setdefault("versions", {})
+        binary = _chrome_binary()
+        binary_mtime = os.path.getmtime(binary) if binary else None
+
+        # Offline fast path: same Chrome binary as last time, so the cached driver still matches
+        cached_path = versions.get(cache.get("chrome_version"))
+        if binary and cache.get("chrome_binary") == binary and cache.get("chrome_mtime") == binary_mtime \
+                and cached_path and os.path.exists(cached_path):
+            _driver_path = cached_path
+            logging.info(f"chromedriver resolved from cache in {(time.perf_counter() - start) * 1000:.0f} ms: {_driver_path}")
+            return _driver_path
+
+        version = chromedriver_autoinstaller.get_chrome_version()
+        cached_path = versions.get(version)
+        if cached_path and os.path.exists(cached_path):
+            _driver_path = cached_path
+            source = "cache"
+        else:
+            _driver_path = ChromeDriverManager().install()
+            source = "download"
+
+        versions[version] = _driver_path
+        cache.update({"chrome_binary": binary, "chrome_mtime": binary_mtime, "chrome_version": version})
+        _save_driver_cache(cache)
+        logging.info(f"chromedriver {version} resolved from {source} in {(time.perf_counter() - start) * 1000:.0f} ms: {_driver_path}")
+        return _driver_path
+
+
+####################
+# BROWSER POOL
+####################
+
+class BrowserPool:
+    """Pool of long-lived headless Chrome sessions with checkout/return"""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES, headless=True):
+        """Sessions are started lazily, so an unused pool costs nothing"""
+        self.size = size
+        self.max_pages = max_pages
+        self.headless = headless
+        self._idle = queue.LifoQueue()
+        self._page_counts = {}
+        self._started = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.startup_times = []
+
+    def _start_driver(self):
+        """Start a new Chrome session"""
+        start = time.perf_counter()
+        service = Service(resolve_driver_path())
+        driver = webdriver.Chrome(service=service, options=default_options(self.headless))
+        # the default 250-entry resource timing buffer fills up on image-heavy listings
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                               {'source': 'performance.setResourceTimingBufferSize(5000);'})
+        elapsed = time.perf_counter() - start
+        self.startup_times.append(elapsed)
+        logging.info(f"Browser pool: started new Chrome session in {elapsed * 1000:.0f} ms")
+        return driver
+
+    def _quit_driver(self, driver):
+        """Quit a session and forget its page count"""
+        self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.error(f"Browser pool: error quitting Chrome session: {e}")
+
+    def _is_healthy(self, driver):
+        """Cheap round trip to make sure the session is still alive"""
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception as e:
+            logging.warning(f"Browser pool: discarding unhealthy session: {e}")
+            return False
+
+    def checkout(self, timeout=BROWSER_CHECKOUT_TIMEOUT):
+        """Take a healthy session from the pool, starting one if there is room"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_start = self._started < self.size
+                    if can_start:
+                        self._started += 1
+                if can_start:
+                    try:
+                        driver = self._start_driver()
+                    except Exception:
+                        with self._lock:
+                            self._started -= 1
+                        raise
+                    self._page_counts[id(driver)] = 0
+                    return driver
+                driver = self._idle.get(timeout=timeout)
+
+            if driver is SLOT_FREED:
+                continue
+            if self._is_healthy(driver):
+                return driver
+
+            self._quit_driver(driver)
+            self._free_slot()
+
+    def _free_slot(self):
+        with self._lock:
+            self._started -= 1
+        if not self._closed:
+            self._idle.put(SLOT_FREED)
+
+    def checkin(self, driver):
+        """Return a session to the pool, recycling it once it has served max_pages"""
+        self._page_counts[id(driver)] = self._page_counts.get(id(driver), 0) + 1
+        if self._closed or self._page_counts[id(driver)] >= self.max_pages:
+            if not self._closed:
+                logging.info(f"Browser pool: recycling session after {self.max_pages} pages")
+            self._quit_driver(driver)
+            self._free_slot()
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def session(self):
+        """Context manager wrapping checkout/checkin"""
+        driver = self.checkout()
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def close(self):
+        """Quit every idle session; sessions still checked out are quit on checkin"""
+        if self.startup_times and not self._closed:
+            logging.info(f"Browser pool: {len(self.startup_times)} Chrome sessions started, "
+                         f"{sum(self.startup_times):.1f} s total startup time")
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is SLOT_FREED:
+                continue
+            self._quit_driver(driver)
+            with self._lock:
+                self._started -= 1
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES):
+    """Process-wide pool so Chrome's cold start is paid once per process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = BrowserPool(size=size, max_pages=max_pages)
+            atexit.register(_shared_pool.close)
+        elif size > _shared_pool.size:
+            _shared_pool.size = size
+        return _shared_pool
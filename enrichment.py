@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from html_parsers import parse_document
+from http_fetch import fetch_html
+from jsonld import find_jsonld_events, map_jsonld_events
+
+####################
+# CONFIGURATION
+####################
+
+ENRICH_WORKERS = 4          # detail pages fetched at once (each host is still rate limited)
+DETAIL_TTL_DAYS = 7         # cached detail fields are reused for this long
+ENRICH_FIELDS = ('time', 'details', 'price')
+MISSING = ("N/A", "Open link for time", "")
+
+
+####################
+# DETAIL CACHE
+####################
+
+class DetailCache:
+    """Fields read from event detail pages, keyed by URL with a time-to-live"""
+
+    def __init__(self, path, ttl_days=DETAIL_TTL_DAYS):
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        if entry and datetime.now() - datetime.fromisoformat(entry["fetched"]) < self.ttl:
+            return entry["fields"]
+        return None
+
+    def put(self, url, fields):
+        with self._lock:
+            self.entries[url] = {"fetched": datetime.now().isoformat(timespec='seconds'), "fields": fields}
+
+    def save(self):
+        now = datetime.now()
+        with self._lock:
+            self.entries = {url: entry for url, entry in self.entries.items()
+                            if now - datetime.fromisoformat(entry["fetched"]) < self.ttl}
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+
+
+####################
+# DETAIL PAGES
+####################
+
+def needs_enrichment(event):
+    return event.get('url', 'N/A').startswith(('http://', 'https://')) and \
+        any(event.get(field, "N/A") in MISSING for field in ENRICH_FIELDS)
+
+
+def selector_text(soup, selector):
+    tag, attrs = next(iter(selector.items()))
+    element = soup.find(tag, **attrs) if attrs else soup.find(tag)
+    text = ' '.join(element.stripped_strings) if element else ''
+    return text or "N/A"
+
+
+def read_detail_page(html_content, selectors):
+    """time/details/price from a detail page: schema.org JSON-LD first, then the site's own selectors"""
+    fields = {}
+    jsonld_events = map_jsonld_events(find_jsonld_events(html_content))
+    if jsonld_events:
+        event = jsonld_events[0]
+        fields = {field: event[field] for field in ENRICH_FIELDS if event[field] not in MISSING}
+
+    missing = [field for field in ENRICH_FIELDS if field not in fields and selectors.get(field)]
+    if missing:
+        soup = parse_document(html_content)
+        for field in missing:
+            value = selector_text(soup, selectors[field])
+            if value not in MISSING:
+                fields[field] = value
+    return fields
+
+
+def fetch_detail_fields(url, selectors, cache):
+    # any failure on one detail page leaves that event unenriched instead of failing the whole site
+    try:
+        cached = cache.get(url)
+        if cached is not None:
+            return cached
+        html_content = fetch_html(url)
+        if html_content is None:
+            return {}
+        fields = read_detail_page(html_content, selectors)
+    except Exception as e:
+        logging.error(f"Could not read detail page {url}: {e}")
+        return {}
+    cache.put(url, fields)
+    return fields
+
+
+def enrich_events(site_name, events, enrich_config, cache):
+    """Fill missing time, details and price from each event's detail page, fetched concurrently"""
+    selectors = enrich_config if isinstance(enrich_config, dict) else {}
+    targets = [event for event in events if needs_enrichment(event)]
+    if not targets:
+        return events
+
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+        results = list(executor.map(lambda event: fetch_detail_fields(event['url'], selectors, cache), targets))
+
+    filled = 0
+    for event, fields in zip(targets, results):
+        for field, value in fields.items():
+            if event.get(field, "N/A") in MISSING:
+                event[field] = value
+                filled += 1
+    for event in events:
+        event.setdefault('price', "N/A")
+    logging.info(f"Enriched {len(targets)} {site_name} events from detail pages ({filled} fields filled)")
+    return events
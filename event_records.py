@@ -0,0 +1,144 @@
+import sys
+from array import array
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+####################
+# CONFIGURATION
+####################
+
+COLUMNS = ('title', 'details', 'date', 'time', 'location', 'url', 'image_url', 'price', 'recurrence', 'category')
+ENCODED = ('location', 'source')    # few distinct values across many rows: stored as codes into one list of values
+
+
+####################
+# EVENT RECORD
+####################
+
+def interned(key, value):
+    # venues and categories repeat across a site's events, so they share one string each
+    if key == 'location' and isinstance(value, str):
+        return sys.intern(value)
+    if key == 'category' and isinstance(value, list):
+        return [sys.intern(entry) if isinstance(entry, str) else entry for entry in value]
+    return value
+
+
+class Event:
+    """One event's fields in slots instead of a dict; reads and writes like the dict it replaces (None is unset)"""
+
+    __slots__ = COLUMNS
+
+    def __init__(self, fields=None, **kwargs):
+        for key in COLUMNS:
+            setattr(self, key, None)
+        for key, value in {**(fields or {}), **kwargs}.items():
+            self[key] = value
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        return cls(dict(mapping))
+
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in COLUMNS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in COLUMNS:
+            raise KeyError(f"Event has no field {key!r}")
+        setattr(self, key, interned(key, value))
+
+    def __contains__(self, key):
+        return key in COLUMNS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in COLUMNS else None
+        return default if value is None else value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        # a keys view, so csv.DictWriter and dict() treat an Event like a dict row
+        return dict.fromkeys(key for key in COLUMNS if getattr(self, key) is not None).keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in COLUMNS if getattr(self, key) is not None}
+
+    def __eq__(self, other):
+        if isinstance(other, (Event, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Event({self.to_dict()!r})"
+
+
+####################
+# COLUMNAR TABLE
+####################
+
+event_row = attrgetter(*COLUMNS)    # every field of an Event in one call, None where unset
+
+
+class EventColumns:
+    """Every site's events appended column by column, turned into one DataFrame at the end"""
+
+    def __init__(self):
+        self.rows = 0
+        # values, or int32 codes for ENCODED columns
+        self.columns = {column: array('i') if column in ENCODED else [] for column in COLUMNS + ('source',)}
+        self.present = set()
+        self.codes = {column: {} for column in ENCODED}     # value -> code
+
+    def encode(self, column, values):
+        codes = self.codes[column]
+        encoded = array('i')
+        for value in values:
+            if value is None:
+                encoded.append(-1)
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            encoded.append(code)
+        return encoded
+
+    def extend(self, events, source=None):
+        # feed and carried-forward events arrive as dicts, the rest as Events
+        rows = [event_row(event) if type(event) is Event else tuple(map(event.get, COLUMNS)) for event in events]
+        for column, values in zip(COLUMNS, zip(*rows) if rows else [()] * len(COLUMNS)):
+            if column not in self.present and any(value is not None for value in values):
+                self.present.add(column)
+            self.columns[column].extend(self.encode(column, values) if column in ENCODED else values)
+        self.columns['source'].extend(self.encode('source', [source]) * len(events))
+        self.rows += len(events)
+
+    def to_dataframe(self):
+        # each column's list is released as soon as it is converted, so the lists and the frame never all coexist
+        data = {}
+        for column in COLUMNS + ('source',):
+            values = self.columns.pop(column)
+            if column != 'source' and column not in self.present:
+                continue
+            if column in ENCODED:
+                data[column] = pd.Categorical.from_codes(np.frombuffer(values, dtype=np.int32), categories=list(self.codes[column]))
+            else:
+                # object columns like pd.DataFrame(events) built; pd.array can't take list values such as category
+                data[column] = pd.Series(values, dtype=object)
+            del values
+        return pd.DataFrame(data, index=pd.RangeIndex(self.rows), copy=False)
@@ -1,17 +1,35 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-import chromedriver_autoinstaller
-from bs4 import BeautifulSoup
+from browser_pool import get_browser_pool
+from page_loading import wait_for_content, scroll_until_plateau, click_load_more
+from browser_extract import extract_in_browser, jsonld_in_browser
+from http_fetch import HostRateLimiter, fetch_html, host_slot, set_host_limiter
+from feeds import FEED_SOURCES, fetch_feed_events
+from fingerprints import FingerprintStore, event_fingerprint, normalize_url
+from snapshot_store import SnapshotStore
+from enrichment import MISSING as ENRICH_MISSING, DetailCache, enrich_events
+from xhr_capture import find_api_source, load_api_sources, save_api_sources
+from jsonld import find_jsonld_events, map_jsonld_events, read_jsonld_scripts
+from event_records import COLUMNS, Event, EventColumns
+from extract_trace import Tracer
+from extract_metrics import ExtractMetrics, save_run
+from html_parsers import DEFAULT_BACKEND, SOUP_BUILDER, available_backends, parse_document
+from fetch_profile import FetchProfileStats, apply_fetch_profile, blocked_patterns, drain_network_log, transfer_summary
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import repeat
+from urllib.parse import urldefrag, urljoin
 from datetime import datetime
 from dateutil import parser
-import pandas as pd
 import time
 import re
 import logging
+import argparse
+import asyncio
 import csv
+import json
+import multiprocessing
+import tracemalloc
 import os
 
 ####################
@@ -29,11 +47,17 @@ if not os.path.exists(LOG_FOLDER):
 if not os.path.exists(DATA_FOLDER):
     os.makedirs(DATA_FOLDER)
 
+LOG_FILE = os.path.join(LOG_FOLDER, 'date_extraction.log')
+
+# extraction workers re-import this script, so only the main process starts a fresh log
+if multiprocessing.current_process().name == "MainProcess":
+    open(LOG_FILE, 'w').close()
+
 logging.basicConfig(
     level = logging.INFO, 
     format = '%(asctime)s - %(levelname)s - %(message)s',
-    filename = os.path.join(LOG_FOLDER, 'date_extraction.log'),  
-    filemode = 'w'  # 'w' to overwrite the log file each time, 'a' to append to it
+    filename = LOG_FILE,  
+    filemode = 'a'  # every process appends, so the workers' lines land after the main process's instead of over them
 )
 
 # DEBUGGING BOOLEANS
@@ -42,6 +66,69 @@ execute_scroll_page = True
 execute_save_html =True
 execute_save_events_to_csv = False
 
+# CONCURRENCY
+execute_concurrent_fetch = True
+FETCH_WORKERS = 4           # sites fetched in parallel, and page loads/HTTP calls in flight across all pools (global cap)
+PER_DOMAIN_LIMIT = 4        # in flight at once against one host, enough for the per-site pagination, feed and enrichment pools; HOST_RATE_PER_SECOND paces them
+HOST_RATE_PER_SECOND = 2.0  # token bucket refill rate per host
+HOST_BURST = 4              # requests a host's bucket can bank while idle
+
+# PAGINATION
+PAGINATION_WORKERS = 3      # pages of one site fetched at once
+PAGINATION_MAX_PAGES = 5    # default cap; override per site with "max_pages" in its pagination spec
+
+# INCREMENTAL CRAWL
+execute_incremental = True
+KNOWN_RUN_LIMIT = 10        # stop scrolling/paging after this many already-known events in a row; per site "known_run_limit"
+FINGERPRINT_FILE = os.path.join(DATA_FOLDER, 'seen_events.json')
+fingerprint_store = None    # loaded by main()
+
+# REQUEST BLOCKING
+execute_block_requests = True   # block images, fonts, media and trackers; per site "fetch_profile": "full" / "allow_urls"
+FETCH_STATS_FILE = os.path.join(DATA_FOLDER, 'fetch_profile_baselines.json')
+fetch_stats = None              # loaded by main()
+
+# SNAPSHOTS
+execute_snapshots = True        # keep every rendered page in snapshots/ for --replay
+REPLAY_CSV = 'all_events_replay.csv'
+
+# DETAIL PAGE ENRICHMENT
+execute_enrichment = True       # fill missing time/details/price from detail pages of sites with "enrich"
+DETAIL_CACHE_FILE = os.path.join(DATA_FOLDER, 'detail_cache.json')
+DETAIL_TTL_DAYS = 7             # detail pages are refetched once their cached fields are this old
+detail_cache = None             # loaded by main()
+
+# API DISCOVERY
+execute_api_sources = True      # read sites with an endpoint found by --discover over plain HTTP instead of rendering
+API_SOURCES_FILE = os.path.join(DATA_FOLDER, 'api_sources.json')
+
+# PARSING
+PARSER_BACKEND = DEFAULT_BACKEND    # "html.parser", "lxml" or "selectolax"; see --bench-parsers
+BENCH_ROUNDS = 3
+execute_partial_parse = True        # build a tree for the content list only, falling back to the whole page
+execute_item_index = True           # walk each item once and answer the extractors' find calls from buckets
+
+# PROCESS EXTRACTION
+execute_process_extract = True      # extract very long item lists in a pool of spawned processes
+PROCESS_EXTRACT_THRESHOLD = 10000   # items below this are extracted in-process; each spawned worker re-imports this script first
+PROCESS_EXTRACT_CHUNK = 250         # items handed to a worker at a time
+PROCESS_EXTRACT_WORKERS = os.cpu_count() or 2
+
+# TRACING
+TRACE_LEVEL = "failures"        # "off", "failures", "values" or "elements" (also dumps matched elements)
+TRACE_SITES = {}                # per site: a level, or {field: level}, e.g. {"Chatt Library": {"date": "values"}}
+TRACE_FIELDS = {}               # per field for every site, e.g. {"url": "elements"}
+TRACE_SAMPLE = 1.0              # share of items traced above "failures"; failures are always reported
+tracer = Tracer(TRACE_LEVEL, TRACE_SITES, TRACE_FIELDS, TRACE_SAMPLE)
+
+# EXTRACTION METRICS
+execute_extract_metrics = True  # per-site, per-field calls, time, N/A rate, exceptions and date branches
+EXTRACT_METRICS_FILE = os.path.join(DATA_FOLDER, 'extract_metrics.json')
+metrics = ExtractMetrics(execute_extract_metrics)
+
+# STRUCTURED DATA
+execute_structured_data = True  # take schema.org Event JSON-LD over the selectors; per site "jsonld": False
+
 
 
 
@@ -51,6 +138,10 @@ SITES = {
  
     "Visit Chattanooga": {
         "url": "https://www.visitchattanooga.com/events/",
+        "wait_timeout": 15,
+        "scroll": False,  # images are read from data-lazy-src, so nothing needs to lazy-load
+        "enrich": True,   # listing has no times; detail pages carry schema.org Event JSON-LD
+        "extract": "browser",  # fields are read in the page; page_source is only transferred for the snapshot
         "content_list_class": {"div": {"class": "content grid"}},
         "item_attr": {"div": {"data-type": "events"}},
         "title": {"a": {"class": "title truncate"}},
@@ -81,6 +172,8 @@ SITES = {
 
     "CHA Guide Events": {
         "url": "https://www.cha.guide/events",
+        "wait_timeout": 10,
+        "render": "http",  # webflow collection is in the initial HTML
         "content_list_class": {"div": {"class": "flex-table w-dyn-items"}},
         "item_attr": {"div": {"role": "listitem"}},
         "title": {"h3": {"class": "event-title"}},
@@ -111,7 +204,14 @@ SITES = {
     },
     
     "Chattanooga Pulse": {
-        "url": "https://www.chattanoogapulse.com/search/event/the-pulse-event-search/#page=1", 
+        "url": "https://www.chattanoogapulse.com/search/event/the-pulse-event-search/#page=1",
+        "wait_timeout": 20,
+        "pagination": {
+            "type": "url_template",
+            "template": "https://www.chattanoogapulse.com/search/event/the-pulse-event-search/#page={page}",
+            "max_pages": 5,
+            "horizon_days": 30,
+            },
         "content_list_class": {"div": {"id": "event_list_div"}},
         "item_attr": {"div": {"class": "event_result"}},
         "title": {"h4": {"class": "event_title"}},
@@ -143,6 +243,18 @@ SITES = {
 
     'Chatt Library': {
         'url': 'https://chattlibrary.org/events/',
+        "wait_timeout": 10,
+        "render": "http",  # tribe events list is rendered server side
+        "source": "tribe_rest",  # read the calendar's JSON feed; the selectors below are the fallback
+        "feed_url": "https://chattlibrary.org/wp-json/tribe/events/v1/events",
+        "ical_url": "https://chattlibrary.org/events/?ical=1",
+        "feed_days": 30,
+        "pagination": {
+            "type": "url_template",
+            "template": "https://chattlibrary.org/events/list/page/{page}/",
+            "max_pages": 5,
+            "horizon_days": 30,
+            },
         "content_list_class": {"div": {"class": "tribe-events-calendar-list"}},
         "item_attr": {"div": {"class": "tribe-common-g-row tribe-events-calendar-list__event-row"}},
         "title": {"a": {"class": "tribe-events-calendar-list__event-title-link tribe-common-anchor-thin"}},
@@ -280,25 +392,330 @@ SITES = {
 # FETCHING & PARSING
 ####################
 
-def fetch_page(url):
-    # pantomJS instead of chrome?
-    chromedriver_autoinstaller.install()
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome()
+def fetch_page(url, pool=None, config=None):
+    # the host slot is taken before checkout so a session never idles waiting on a rate limit
+    with host_slot(url):
+        return render_page(url, pool, config)
+
+def render_page(url, pool=None, config=None, collect=None):
+    # sessions come from a shared pool, so chrome only cold starts once per run
+    # collect(driver) replaces page_source as what gets returned from the loaded page
+    pool = pool or get_browser_pool()
+    driver = pool.checkout()
     
     try:
+        if urldefrag(driver.current_url)[0] == urldefrag(url)[0]:
+            driver.get("about:blank")  # a hash-only change (e.g. #page=2) would not reload a reused session
+        # a site's first run loads everything once so the blocked runs have a baseline to compare against
+        patterns = blocked_patterns(config) if execute_block_requests else []
+        blocking = bool(patterns) and not (fetch_stats and fetch_stats.needs_baseline(url))
+        apply_fetch_profile(driver, patterns if blocking else [])
+        drain_network_log(driver)  # drop events left over from the session's previous page
+        start = time.perf_counter()
         driver.get(url)
-        time.sleep(5)  # Wait for JavaScript to load content
+        wait_for_content(driver, config)  # Wait until the site's items are present and stable
+        pagination = (config or {}).get("pagination", {})
+        if pagination.get("type") == "load_more":
+            click_load_more(driver, config, pagination.get("max_pages", PAGINATION_MAX_PAGES) - 1)
         if execute_scroll_page:
-            scroll_page(driver)  # Scroll the page to ensure all content is loaded
-        html_content = driver.page_source
+            scroll_page(driver, config)  # Scroll the page to ensure all content is loaded
+        html_content = collect(driver) if collect else driver.page_source
+        if fetch_stats:
+            fetch_stats.record(url, blocking, transfer_summary(drain_network_log(driver)), time.perf_counter() - start)
         return html_content, driver
     except Exception as e:
         logging.error(f"Error fetching the page: {e}")
         return None, driver
     finally:
         logging.info(f"{url} fetched")
-        driver.quit()
+        pool.checkin(driver)
+
+def strain_content_list(html_content, config, builder=None):
+    # only builds a tree for the content list container, so it is much cheaper than parse_html
+    content_list_tag, content_list_attrs = next(iter(config['content_list_class'].items()))
+    strainer = SoupStrainer(content_list_tag, attrs=content_list_attrs or {})
+    return BeautifulSoup(html_content, builder or SOUP_BUILDER, parse_only=strainer)
+
+def parse_content_list(html_content, config):
+    return find_content_list(strain_content_list(html_content, config), config)
+
+def has_content_list(html_content, config):
+    return parse_content_list(html_content, config) is not None
+
+def fetch_site(config, pool=None):
+    # "render": "http" sites skip the browser unless their content list is missing from the raw HTML
+    url = config["url"]
+    if config.get("render") == "http":
+        html_content = fetch_html(url)
+        if html_content and has_content_list(html_content, config):
+            return html_content
+        logging.info(f"Content list not in HTTP response for {url}, falling back to the browser")
+    html_content, driver = fetch_page(url, pool, config)
+    return html_content
+
+def collect_browser_page(driver, config):
+    # the raw field rows plus the page's JSON-LD; page_source only comes along for the snapshot,
+    # or when there are no rows so the same render can be parsed instead
+    rows = extract_in_browser(driver, config)
+    page = driver.page_source if rows is None or execute_snapshots else None
+    scripts = jsonld_in_browser(driver) if page is None and structured_enabled(config) else None
+    return rows, scripts, page
+
+def fetch_browser_events(config, pool=None):
+    # "extract": "browser" sites are read inside the page; returns (page_source or None, events or None)
+    url = config["url"]
+    with host_slot(url):
+        result, driver = render_page(url, pool, config, collect=lambda driver: collect_browser_page(driver, config))
+    if result is None:
+        return None, None
+    rows, scripts, page = result
+    if rows is None:
+        return page, None
+    if scripts is not None:
+        structured = structured_events(read_jsonld_scripts(scripts))
+    else:
+        structured = extract_structured_events(page, config)
+    structured_by_url = index_structured(structured)
+    try:
+        return page, [event_from_row(row, config, structured_by_url) for row in rows]
+    finally:
+        # this is a fetch thread, which goes on to other sites' pagination checks; those aren't counted
+        tracer.end()
+        metrics.begin(None)
+
+def fetch_site_content(config, pool=None):
+    # feed sources come back as finished events; everything else as html for parse_html/extract_events.
+    # browser-read sites return both, the html only being there for the snapshot
+    if config.get("source") in FEED_SOURCES:
+        events = fetch_feed_events(config)
+        if events is not None:
+            return None, events
+        logging.info(f"Feed unavailable for {config['url']}, scraping the page instead")
+    # page-by-page pagination still goes through page_source; load_more happens inside render_page
+    if config.get("extract") == "browser" and config.get("pagination", {}).get("type") in (None, "load_more"):
+        html_content, events = fetch_browser_events(config, pool)
+        if events is not None:
+            return html_content, events
+        if html_content:
+            logging.info(f"In-browser extraction found no content list on {config['url']}, parsing the page source")
+            return html_content, None
+        logging.info(f"In-browser extraction failed on {config['url']}, rendering the page again")
+    if config.get("pagination"):
+        return fetch_paginated(config, pool), None
+    return fetch_site(config, pool), None
+
+####################
+# PAGINATION
+####################
+
+# "pagination" specs in SITES:
+#   {"type": "url_template", "template": ".../page/{page}/", "page_count": {"a": {"class": "page-numbers"}}}
+#   {"type": "next_link", "next": {"a": {"class": "next"}}}
+#   {"type": "load_more", "button": {"button": {"class": "load-more"}}}
+# plus optional "max_pages" and "horizon_days" (stop once a page's last event is further out than that)
+
+def event_date_offset(date):
+    # days from today for an "MM-DD" date, rolling into next year for dates well in the past
+    try:
+        event_day = datetime.strptime(date, "%m-%d")
+    except ValueError:
+        return None
+    today = datetime.now().date()
+    event_day = event_day.replace(year=today.year).date()
+    if (today - event_day).days > 180:
+        event_day = event_day.replace(year=today.year + 1)
+    return (event_day - today).days
+
+def page_status(html_content, config):
+    # returns (has_items, last_page) for one fetched page; last_page means keep this page but fetch no more
+    content_list = parse_content_list(html_content, config) if html_content else None
+    items = find_items(content_list, config) if content_list else []
+    if not items:
+        return False, False
+    if ends_in_known_run(items, config):
+        return True, True
+    horizon_days = config["pagination"].get("horizon_days")
+    if horizon_days is None:
+        return True, False
+    date, event_time = extract_date_and_time(items[-1], get_plan(config))
+    offset = event_date_offset(date)
+    return True, offset is not None and offset > horizon_days
+
+####################
+# INCREMENTAL CRAWL
+####################
+
+def known_run_limit(config):
+    # None when incremental crawling is off for this run or site
+    if not (execute_incremental and fingerprint_store):
+        return None
+    return (config or {}).get("known_run_limit", KNOWN_RUN_LIMIT)
+
+def item_fingerprint(site_name, item, title, url, plan):
+    # the fingerprint remember_events stores for this item, with the date and time it was built from
+    date, event_time = extract_date_and_time(item, plan)
+    return event_fingerprint(site_name, title, date, url), date, event_time
+
+def stop_crawl(config):
+    # the rest of this site's listing wasn't reached, so its recently seen events are carried forward
+    if fingerprint_store and config.get("site_name"):
+        fingerprint_store.stop_early(config["site_name"])
+
+def ends_in_known_run(items, config):
+    limit = known_run_limit(config)
+    if not limit or len(items) < limit:
+        return False
+    plan = get_plan(config)
+    for item in items[-limit:]:
+        title, title_element = extract_title(item, plan)
+        url = extract_event_url(item, title_element, plan)
+        fingerprint, date, event_time = item_fingerprint(config.get("site_name"), item, title, url, plan)
+        if not fingerprint_store.known(fingerprint):
+            return False
+    stop_crawl(config)
+    return True
+
+def cached_event(site_name, item, title, url, plan):
+    # the stored record for an already-known item (so the remaining extract_* calls can be skipped) and the
+    # (date, time) read to look it up, which extract_item reuses for an unknown item; (None, None) when off
+    if not (execute_incremental and fingerprint_store):
+        return None, None
+    date_and_time = metrics.timed("date", extract_date_and_time, item, plan)
+    return known_event(site_name, title, url, *date_and_time), date_and_time
+
+def known_event(site_name, title, url, date, event_time):
+    if not (execute_incremental and fingerprint_store):
+        return None
+    known = fingerprint_store.get(event_fingerprint(site_name, title, date, url))
+    # a rescheduled event keeps its URL, so the record is only reused while the listing's date and time still match;
+    # a placeholder time on the listing may have been filled from the detail page, so it doesn't count
+    if known and known.get('date') == date and (event_time in ENRICH_MISSING or known.get('time') == event_time):
+        return known
+    return None
+
+def remember_events(site_name, events):
+    # records this run's events and, if the crawl stopped on known events, appends recent ones it didn't reach
+    if not (execute_incremental and fingerprint_store):
+        return events
+    for event in events:
+        fingerprint_store.remember(event_fingerprint(site_name, event['title'], event['date'], event['url']), site_name, event)
+    carried = [event for event in fingerprint_store.carry_forward(site_name) if (event_date_offset(event['date']) or 0) >= 0]
+    if carried:
+        logging.info(f"Carried forward {len(carried)} known {site_name} events not reached this run")
+    return events + carried
+
+def discover_page_count(html_content, spec):
+    # highest page number among the site's page links, or None to probe until pages run dry
+    if not spec.get("page_count"):
+        return None
+    link_tag, link_attrs = next(iter(spec["page_count"].items()))
+    soup = BeautifulSoup(html_content, SOUP_BUILDER, parse_only=SoupStrainer(link_tag))
+    numbers = [int(link.text.strip()) for link in soup.find_all(link_tag, **link_attrs) if link.text.strip().isdigit()]
+    return max(numbers) if numbers else None
+
+def find_next_link(html_content, spec, base_url):
+    link_tag, link_attrs = next(iter(spec["next"].items()))
+    soup = BeautifulSoup(html_content, SOUP_BUILDER, parse_only=SoupStrainer(link_tag))
+    link = soup.find(link_tag, **link_attrs)
+    href = link.get('href') if link else None
+    return urljoin(base_url, href) if href else None
+
+def fetch_paginated(config, pool=None):
+    # returns the html of every page in order; extract_events sees their items concatenated
+    spec = config["pagination"]
+    max_pages = spec.get("max_pages", PAGINATION_MAX_PAGES)
+    if spec["type"] == "load_more":
+        html_content, driver = fetch_page(config["url"], pool, config)
+        return [html_content] if html_content else None
+
+    first_page = fetch_site(config, pool)
+    if not first_page:
+        return None
+    pages = [first_page]
+    has_items, last_page = page_status(first_page, config)
+    if not has_items or last_page:
+        return pages
+
+    if spec["type"] == "next_link":
+        url = config["url"]
+        while len(pages) < max_pages:
+            url = find_next_link(pages[-1], spec, url)
+            if not url:
+                break
+            html_content = fetch_site({**config, "url": url}, pool)
+            has_items, last_page = page_status(html_content, config)
+            if not has_items:
+                break
+            pages.append(html_content)
+            if last_page:
+                break
+
+    elif spec["type"] == "url_template":
+        page_count = discover_page_count(first_page, spec)
+        final_page = min(page_count, max_pages) if page_count else max_pages
+        # with a known page count everything is fetched at once; otherwise probe a batch at a time
+        batch_size = final_page if page_count else PAGINATION_WORKERS
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=PAGINATION_WORKERS) as executor:
+            while next_page <= final_page:
+                batch = range(next_page, min(next_page + batch_size, final_page + 1))
+                urls = [spec["template"].format(page=page) for page in batch]
+                batch_pages = list(executor.map(lambda url: fetch_site({**config, "url": url}, pool), urls))
+                next_page += len(batch)
+                for html_content in batch_pages:
+                    has_items, last_page = page_status(html_content, config)
+                    if not has_items:
+                        break
+                    pages.append(html_content)
+                    if last_page:
+                        break
+                if not has_items or last_page:
+                    break
+
+    logging.info(f"Fetched {len(pages)} pages of {config['url']}")
+    return pages
+
+####################
+# API DISCOVERY
+####################
+
+def discover_api_source(site_name, config, pool=None):
+    # renders the listing once and looks through its XHR/fetch JSON for an array of events
+    pool = pool or get_browser_pool()
+    with host_slot(config["url"]):
+        driver = pool.checkout()
+        try:
+            apply_fetch_profile(driver, blocked_patterns(config))
+            drain_network_log(driver)
+            driver.get(config["url"])
+            wait_for_content(driver, config)
+            if execute_scroll_page:
+                scroll_page(driver, config)  # infinite-scroll widgets often fetch later pages from the same endpoint
+            spec = find_api_source(driver, drain_network_log(driver))
+        except Exception as e:
+            logging.error(f"API discovery failed for {site_name}: {e}")
+            spec = None
+        finally:
+            pool.checkin(driver)
+    if spec:
+        logging.info(f"{site_name}: events come from {spec['api_url']} at {spec['items_path']}, fields {spec['fields']}")
+    else:
+        logging.info(f"{site_name}: no JSON response with an event array")
+    return spec
+
+def with_api_sources(sites):
+    # sites without a feed of their own are read from their discovered endpoint; the page is the fallback
+    if not execute_api_sources:
+        return sites
+    api_sources = load_api_sources(API_SOURCES_FILE)
+    merged = {}
+    for site_name, config in sites.items():
+        spec = api_sources.get(site_name)
+        if spec and not config.get("source"):
+            logging.info(f"Reading {site_name} from its captured API ({spec['api_url']})")
+            config = {**config, "source": "api", "api": spec}
+        merged[site_name] = config
+    return merged
 
 
 
@@ -337,11 +754,14 @@ def find_potential_containers(parsed_content):
     for container in potential_containers:
         logging.info(f"Potential container found: {container.get('class')}")
 
-def scroll_page(driver):
-    total_height = driver.execute_script("return document.body.scrollHeight")
-    for i in range(1, total_height, 100):
-        driver.execute_script(f"window.scrollTo(0, {i});")
-        time.sleep(0.1)
+def scroll_page(driver, config=None):
+    # one in-page script; stops once the site's item count stops growing (sites can set "scroll": False)
+    limit = known_run_limit(config)
+    known_urls = fingerprint_store.known_urls() if limit else None
+    result = scroll_until_plateau(driver, config, known_urls, limit)
+    if result and result.get('known'):
+        stop_crawl(config or {})
+    return result
 
 def save_html(html_content, site_name):
     file_name = os.path.join(LOG_FOLDER, f"{site_name}.html")
@@ -371,8 +791,10 @@ def capture_network_requests(site_name, driver):
 def save_events_to_csv(events, site_name):
     file_name = os.path.join(DATA_FOLDER, f"{site_name}_events.csv")
     with open(file_name, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = events[0].keys()
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        # unset fields are left out of an Event's keys, so the header is every field any row has, in COLUMNS order
+        present = dict.fromkeys(key for event in events for key in event.keys())
+        fieldnames = [key for key in COLUMNS if key in present] + [key for key in present if key not in COLUMNS]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval="N/A")
 
         writer.writeheader()
         for event in events:
@@ -382,417 +804,1111 @@ def save_events_to_csv(events, site_name):
 # EXTRACTION 
 ####################
 
-def parse_html(html_content):
+def parse_html(html_content, backend=None):
     logging.info("#### HTML PARSED ####")
     logging.info("#" * 80)
-    return BeautifulSoup(html_content, 'html.parser')
-
-def extract_title(item, config):
+    return parse_document(html_content, backend or PARSER_BACKEND)
+
+def parse_subtree(html_content, config, backend=None):
+    # extract_events never looks outside the content list, so headers, nav, footers and scripts aren't built
+    backend = backend or PARSER_BACKEND
+    content_list_attrs = next(iter(config['content_list_class'].values()))
+    # lexbor parses a whole page faster than a strained soup, and an attribute-less container matches every tag
+    if not execute_partial_parse or backend == "selectolax" or not content_list_attrs:
+        return parse_html(html_content, backend)
+    partial = strain_content_list(html_content, config, backend)
+    if find_content_list(partial, config) is None:
+        logging.info("Content list not found by the partial parse, parsing the whole page")
+        return parse_html(html_content, backend)
+    logging.info("#### CONTENT LIST PARSED ####")
+    return partial
+
+def find_one(element, selector):
+    tag, attrs = selector
+    return element.find(tag, **attrs) if attrs else element.find(tag)
+
+def find_every(element, selector):
+    tag, attrs = selector
+    return element.find_all(tag, **attrs) if attrs else element.find_all(tag)
+
+def extract_title(item, plan):
     try:
-        title_tag, title_attrs = next(iter(config.get('title', {}).items()), (None, None))
-        logging.info(f"title_tag: {title_tag}")
-        logging.info(f"title_attrs: {title_attrs}")
-        if not title_tag:
+        if not plan.title:
             return "N/A", None
         
-        title_element = item.find(title_tag, **title_attrs)
-        logging.info(f"title_element: {title_element}")
+        title_element = find_one(item, plan.title)
+        tracer.element("title", "title_element", title_element)
         if not title_element:
+            tracer.failure("title", "no title element", item)
             return "N/A", None
         
         a_tag = title_element.find('a') if title_element.name != 'a' else title_element
         title = a_tag.text.strip() if a_tag else title_element.text.strip()
+        tracer.value("title", "title=%r", title)
         
         return title, title_element
     except Exception as e:
         logging.error(f"Error extracting title: {e}")
+        tracer.failure("title", e, item)
+        metrics.error("title")
         return "N/A", None
 
-def extract_event_url(item, title_element, config):
-    try:
-        url_config = config.get('event_url', {})
-        logging.info(f"url_config: {url_config}")
-     
-        base_url = url_config.get('base_url', '')  
-        logging.info(f"base_url: {base_url}")  
-        
-        parse_method = url_config.get('parse_method')
-
-        if parse_method == "title":
-            href_element = title_element.get('href', '')
-            logging.info(f"href_element: {href_element}")
-
-            if href_element:
-                url = base_url + href_element 
-                logging.info(f"url: {url}")
-                logging.info("*" * 80)
-                return url
-            else:
-                a_tag = title_element.find('a')
-                logging.info(f"a_tag: {a_tag}")
-                href_element = a_tag.get('href', '') if a_tag else ''
-                logging.info(f"href_element: {href_element}")
-                url = base_url + href_element 
-                logging.info(f"url: {url}")
-                logging.info("*" * 80)
-                return url
-
-        if parse_method == "tag":
-            url_tag = url_config.get('tag')
-            logging.info(f"url_tag: {url_tag}")
-
-            url_attrs = url_config.get('attrs', {})
-            logging.info(f"url_attrs: {url_attrs}")
-           
-            url_element = item.find(url_tag, **url_attrs)
-            logging.info(f"url_element: {url_element}")
-            if not url_element or 'href' not in url_element.attrs:
-                logging.info("*" * 80)
-                return "N/A"
-
-            url = url_element['href']
-            logging.info(f"url: {url}")
-
-            url = base_url + url if url != "N/A" and not url.startswith(('http://', 'https://')) else url
-            logging.info(f"url: {url}")
-            logging.info("*" * 80)
-
-            return url
-        
+def url_from_title(item, title_element, base_url, selector=None):
+    href_element = title_element.get('href', '')
+
+    if href_element:
+        url = base_url + href_element 
+        tracer.value("url", "href=%r url=%r", href_element, url)
+        return url
+    else:
+        a_tag = title_element.find('a')
+        tracer.element("url", "a_tag", a_tag)
+        href_element = a_tag.get('href', '') if a_tag else ''
+        url = base_url + href_element 
+        tracer.value("url", "href=%r url=%r", href_element, url)
+        return url
+
+def url_from_tag(item, title_element, base_url, selector=None):
+    url_element = find_one(item, selector)
+    tracer.element("url", "url_element", url_element)
+    if not url_element or 'href' not in url_element.attrs:
+        tracer.failure("url", "no url element with an href", item)
         return "N/A"
+
+    url = url_element['href']
+    url = base_url + url if url != "N/A" and not url.startswith(('http://', 'https://')) else url
+    tracer.value("url", "href=%r url=%r", url_element['href'], url)
+
+    return url
+
+def extract_event_url(item, title_element, plan):
+    try:
+        if not plan.url:
+            return "N/A"
+        return plan.url(item, title_element)
     except Exception as e:
         logging.error(f"Error extracting event URL: {e}")
+        tracer.failure("url", e, item)
+        metrics.error("url")
         return "N/A"
 
-def parse_date_range(date_text, config):
+def parse_with_dateutil(date_text, branch="parser.parse"):
+    date_info = parser.parse(date_text, fuzzy=True)
+    date = date_info.strftime("%m-%d")
+    time = date_info.strftime("%I:%M %p")
+    tracer.value("date", "parser.parse date_info=%s date=%s time=%s", date_info, date, time)
+    metrics.branch(branch)
+    return date, time
+
+def parse_time_range(date_text):
     try:
-        date_config = config.get('date', {})
-        parse_method = date_config.get('parse_method')
-        
-        if parse_method == "parser.parse":
-            date_info = parser.parse(date_text, fuzzy=True)
-            logging.info(f"date_info: {date_info}")
-            date = date_info.strftime("%m-%d")
-            logging.info(f"date: {date}")
-            time = date_info.strftime("%I:%M %p")
-            logging.info(f"time: {time}")
-            logging.info("*" * 80)
-            return date, time
-
-        if parse_method == "time_range":
-            try:
-                date_info = parser.parse(date_text, fuzzy=True)
-                logging.info(f"date_info: {date_info}")
-                date = date_info.strftime("%m-%d")
-                logging.info(f"date: {date}")
-                time = date_info.strftime("%I:%M %p")
-                logging.info(f"time: {time}")
-                logging.info("*" * 80)
-                return date, time
-            except Exception as e:
-                logging.info(f"First parsing attempt failed: {e}")
-            try:
-                date_part, time_part = date_text.split("@")
-                logging.info(f"date_part: {date_part}")
-                logging.info(f"time_part: {time_part}")
-                date_obj = parser.parse(date_part, fuzzy=True)
-                logging.info(f"date_obj: {date_obj}")
-                date = date_obj.strftime("%m-%d")
-                logging.info(f"date: {date}")
-                time = time_part
-                logging.info(f"time: {time}")
-                logging.info("*" * 80)
-                return date, time
-            except Exception as e:
-                logging.info(f"Second parsing attempt failed: {e}")
-                date = "Unexpected input."
-                time = "Event may have multiple dates or times."
-                return date, time
-
-        if parse_method == "split":
-            date_info, time_info = date_text.split(",")
-            logging.info(f"date_info: {date_info}")
-            logging.info(f"time_info: {time_info}")
-            date_obj = datetime.strptime(date_info, "%b %d")
-            logging.info(f"date_obj: {date_obj}")
-            date = datetime.strftime(date_obj, "%m-%d")
-            logging.info(f"date: {date}")
-            time_info = time_info[6:14]
-            logging.info(f"time_info: {time_info}")
-            if time_info != "":
-                time_obj = parser.parse(time_info)
-                logging.info(f"time_obj: {time_obj}")
-                time = datetime.strftime(time_obj, "%I:%M %p")
-            else:
-                time = "12:00 AM"
-            logging.info(f"time: {time}")
-            logging.info("*" * 80)
-            return date, time
-            
-        if parse_method == "split '@'":
-            date_info, time_info = date_text.split(" @ ")
-            logging.info(f"date_info: {date_info}")
-            logging.info(f"time_info: {time_info}")
-            date_obj = datetime.strptime(date_info, "%B %d")
-            logging.info(f"date_obj: {date_obj}")
-            date = datetime.strftime(date_obj, "%m-%d")
-            logging.info(f"date: {date}")
-            
-            time_obj = parser.parse(time_info)
-            logging.info(f"time_obj: {time_obj}")
-            time = datetime.strftime(time_obj, "%I:%M %p")
-            logging.info(f"time: {time}")
-            logging.info("*" * 80)
-            return date, time
+        return parse_with_dateutil(date_text, branch="time_range: parser.parse")
+    except Exception as e:
+        tracer.value("date", "first parsing attempt failed: %s", e)
+    try:
+        date_part, time_part = date_text.split("@")
+        date_obj = parser.parse(date_part, fuzzy=True)
+        date = date_obj.strftime("%m-%d")
+        time = time_part
+        tracer.value("date", "time_range date_part=%r time_part=%r date=%s", date_part, time_part, date)
+        metrics.branch("time_range: split '@'")
+        return date, time
+    except Exception as e:
+        tracer.failure("date", f"second parsing attempt failed: {e}", date_text)
+        metrics.branch("time_range: unparsed")
+        date = "Unexpected input."
+        time = "Event may have multiple dates or times."
+        return date, time
 
-        return "N/A", "N/A"
+def parse_split_comma(date_text):
+    date_info, time_info = date_text.split(",")
+    date_obj = datetime.strptime(date_info, "%b %d")
+    date = datetime.strftime(date_obj, "%m-%d")
+    time_info = time_info[6:14]
+    if time_info != "":
+        time_obj = parser.parse(time_info)
+        time = datetime.strftime(time_obj, "%I:%M %p")
+    else:
+        time = "12:00 AM"
+    tracer.value("date", "split date_info=%r time_info=%r date=%s time=%s", date_info, time_info, date, time)
+    metrics.branch("split")
+    return date, time
+
+def parse_split_at(date_text):
+    date_info, time_info = date_text.split(" @ ")
+    date_obj = datetime.strptime(date_info, "%B %d")
+    date = datetime.strftime(date_obj, "%m-%d")
+    
+    time_obj = parser.parse(time_info)
+    time = datetime.strftime(time_obj, "%I:%M %p")
+    tracer.value("date", "split '@' date_info=%r time_info=%r date=%s time=%s", date_info, time_info, date, time)
+    metrics.branch("split '@'")
+    return date, time
+
+# "parse_method" in a site's "date" config -> the function that turns its date text into (date, time)
+DATE_PARSERS = {
+    "parser.parse": parse_with_dateutil,
+    "time_range": parse_time_range,
+    "split": parse_split_comma,
+    "split '@'": parse_split_at,
+}
+
+def parse_date_range(date_text, plan):
+    try:
+        return plan.parse_date(date_text)
     except Exception as e:
         logging.error(f"Error parsing date range: {e}")
+        tracer.failure("date", e, date_text)
+        metrics.error("date")
+        metrics.branch(f"{plan.date_method}: error")
         return "N/A", "N/A"
 
-def extract_date_and_time(item, config):
+def date_and_time_from_text(date_text, plan):
+    date, time = parse_date_range(date_text, plan)
+    if time == "12:00 AM":
+        time = "Open link for time"
+    return date, time
+
+def extract_date_and_time(item, plan):
     try:
-        date_config = config.get('date', {})
-        logging.info(f"date_config: {date_config}")
-        extract_method = date_config.get('extract_method')
-        logging.info(f"extract_method: {extract_method}")
-        date_tag = date_config.get('tag')
-        logging.info(f"date_tag: {date_tag}")
-        date_attrs = date_config.get('attrs')
-        logging.info(f"date_attrs: {date_attrs}")
+        if not plan.date:
+            return "N/A", "N/A"
+        
+        date_element = find_one(item, plan.date)
+        tracer.element("date", "date_element", date_element)
         
-        if not date_tag:
-            logging.info("*" * 80)
+        if not date_element:
+            tracer.failure("date", "no date element", item)
             return "N/A", "N/A"
         
-        if extract_method == "attrs":
-            date_element = item.find(date_tag, **date_attrs) if date_attrs else item.find(date_tag)
-            logging.info(f"date_element: {date_element}")
-            
-            if not date_element:
-                logging.info("*" * 80)
-                return "N/A", "N/A"
-            
-            date_text = date_element.text.strip()
-            logging.info(f"date_text: {date_text}")
-
-        elif extract_method == "tag":
-            date_element = item.find(date_tag,)
-            logging.info(f"date_element: {date_element}")
-            date_text = date_element.text.strip()
-            logging.info(f"date_text: {date_text}")
-
-        date, time = parse_date_range(date_text, config)  
-        if time == "12:00 AM":
-            time = "Open link for time"
-        logging.info("*" * 80)
+        date_text = date_element.text.strip()
+        tracer.value("date", "date_text=%r", date_text)
+
+        date, time = date_and_time_from_text(date_text, plan)
         return date, time
     except Exception as e:
         logging.error(f"Error extracting date and time: {e}")
+        tracer.failure("date", e, item)
+        metrics.error("date")
         return "N/A", "N/A"
 
-def extract_image_url(item, config):
+def srcset_url(srcset):
+    urls = srcset.split(', ')
+    for url in urls:
+        if '220w' in url:
+            return url.split(' ')[0]
+    return urls[0].split(' ')[0] if urls else "N/A"
+
+def background_url(style):
+    match = re.search(r'background-image:\s*url\("(.+?)"\)', style)
+    return match.group(1) if match else "N/A"
+
+def image_lazy_src(item, img_selector):
+    img_element = find_one(item, img_selector)
+    return img_element.get('data-lazy-src') or img_element.get('src') if img_element else "N/A"
+
+def image_srcset_220w(item, container_selector, tag, attr):
+    container = find_one(item, container_selector)
+    if not container:
+        return "N/A"
+    img_element = container.find(tag)
+    if not img_element or attr not in img_element.attrs:
+        return "N/A"
+    return srcset_url(img_element[attr])
+
+def image_style_background(item, container_selector):
+    container = find_one(item, container_selector)
+    if not container or 'style' not in container.attrs:
+        return "N/A"
+    return background_url(container['style'])
+
+def image_attr(item, container_selector, tag, attr):
+    container = find_one(item, container_selector)
+    if not container:
+        return "N/A"
+    img_element = container.find(tag)
+    return img_element.get(attr) if img_element else "N/A"
+
+def extract_image_url(item, plan):
     try:
-        img_config = config.get('img', {})
-        if not img_config:
+        if not plan.image:
             return "N/A"
-        
-        parse_method = img_config.get('parse_method')
-        
-        if parse_method == 'lazy-src':
-            img_tag, img_attrs = next(iter(img_config.items()))
-            img_element = item.find(img_tag, **img_attrs)
-            return img_element.get('data-lazy-src') or img_element.get('src') if img_element else "N/A"
-        
-        elif parse_method == 'srcset_220w':
-            container_tag, container_attrs = next(iter(img_config['container'].items()))
-            container = item.find(container_tag, **container_attrs)
-            if not container:
-                return "N/A"
-            img_element = container.find(img_config['tag'])
-            if not img_element or img_config['attr'] not in img_element.attrs:
-                return "N/A"
-            srcset = img_element[img_config['attr']]
-            urls = srcset.split(', ')
-            for url in urls:
-                if '220w' in url:
-                    return url.split(' ')[0]
-            return urls[0].split(' ')[0] if urls else "N/A"
-        
-        elif parse_method == 'style_background':
-            container_tag, container_attrs = next(iter(img_config['container'].items()))
-            container = item.find(container_tag, **container_attrs)
-            if not container or 'style' not in container.attrs:
-                return "N/A"
-            style = container['style']
-            match = re.search(r'background-image:\s*url\("(.+?)"\)', style)
-            return match.group(1) if match else "N/A"
-        
-        elif parse_method == 'none':
-            container_tag, container_attrs = next(iter(img_config['container'].items()))
-            container = item.find(container_tag, **container_attrs)
-            if not container:
-                return "N/A"
-            img_element = container.find(img_config['tag'])
-            return img_element.get(img_config['attr']) if img_element else "N/A"
-        
-        return "N/A"
+        image_url = plan.image(item)
+        if image_url == "N/A":
+            tracer.failure("image", "no image", item)
+        else:
+            tracer.value("image", "image_url=%r", image_url)
+        return image_url
     except Exception as e:
         logging.error(f"Error extracting image URL: {e}")
+        tracer.failure("image", e, item)
+        metrics.error("image")
         return "N/A"
 
-def extract_location(item, config):
+def extract_location(item, plan):
     try:
-        location_tag, location_attrs = next(iter(config.get('location', {}).items()), (None, None))
-        if not location_tag:
+        if not plan.location:
             return "N/A"
         
-        parent_class = config.get('location', {}).get('parent', {}).get('class')
-        parent_element = item.find('div', class_=parent_class) if parent_class else item
+        parent_element = item.find('div', class_=plan.location_parent) if plan.location_parent else item
         
-        location_elements = parent_element.find_all(location_tag, **location_attrs) if location_attrs else parent_element.find_all(location_tag)
-        return " | ".join([loc.text.strip() for loc in location_elements]) if location_elements else "N/A"
+        location_elements = find_every(parent_element, plan.location)
+        if not location_elements:
+            tracer.failure("location", "no location elements", item)
+            return "N/A"
+        location = " | ".join([loc.text.strip() for loc in location_elements])
+        tracer.value("location", "location=%r", location)
+        return location
     except Exception as e:
         logging.error(f"Error extracting location: {e}")
+        tracer.failure("location", e, item)
+        metrics.error("location")
         return "N/A"
 
-def extract_recurrence(item, config):
+def extract_recurrence(item, plan):
     try:
-        recurrence_tag, recurrence_attrs = next(iter(config.get('recurrence', {}).items()), (None, None))
-        if not recurrence_tag:
+        if not plan.recurrence:
             return "N/A"
         
-        recurrence_element = item.find(recurrence_tag, **recurrence_attrs) if recurrence_attrs else item.find(recurrence_tag)
+        recurrence_element = find_one(item, plan.recurrence)
         return recurrence_element.text.strip() if recurrence_element else "N/A"
     except Exception as e:
         logging.error(f"Error extracting recurrence: {e}")
+        tracer.failure("recurrence", e, item)
+        metrics.error("recurrence")
         return "N/A"
 
-def extract_category(item, config):
+def extract_category(item, plan):
     try:
-        category_tag, category_attrs = next(iter(config.get('category', {}).items()), (None, None))
-        if not category_tag:
+        if not plan.category:
             return ["N/A"]
         
-        category_elements = item.find_all(category_tag, **category_attrs) if category_attrs else item.find_all(category_tag)
+        category_elements = find_every(item, plan.category)
         return [cat.text.strip() for cat in category_elements] if category_elements else ["N/A"]
     except Exception as e:
         logging.error(f"Error extracting category: {e}")
+        tracer.failure("category", e, item)
+        metrics.error("category")
         return ["N/A"]
 
-def extract_details(item, config):
+def extract_details(item, plan):
     try:
-        details_tag, details_attrs = next(iter(config.get('details', {}).items()), (None, None))
-        if not details_tag:
+        if not plan.details:
             return "N/A"
         
-        details_element = item.find(details_tag, **details_attrs) if details_attrs else item.find(details_tag)
+        details_element = find_one(item, plan.details)
+        tracer.element("details", "details_element", details_element)
         if not details_element:
+            tracer.failure("details", "no details element", item)
             return "N/A"
         
         details_text = ' '.join(details_element.stripped_strings)
         return details_text if details_text else "N/A"
     except Exception as e:
         logging.error(f"Error extracting details: {e}")
+        tracer.failure("details", e, item)
+        metrics.error("details")
+        return "N/A"
+
+def event_url_from_href(href, plan):
+    # the same joins extract_event_url makes, for an href read in the browser
+    if href is None:
         return "N/A"
+    if plan.url_method == "title" or not href.startswith(('http://', 'https://')):
+        return plan.base_url + href
+    return href
+
+def image_url_from_raw(raw, plan):
+    if not raw:
+        return "N/A"
+    if plan.image_method == 'srcset_220w':
+        return srcset_url(raw)
+    if plan.image_method == 'style_background':
+        return background_url(raw)
+    return raw
+
+def date_and_time_from_row(date_text, plan):
+    return date_and_time_from_text(date_text, plan) if date_text else ("N/A", "N/A")
+
+def event_from_row(row, config, structured_by_url=None):
+    # the extract_item record for one row of raw strings from extract_in_browser
+    site_name = config.get("site_name")
+    tracer.begin(site_name)
+    metrics.begin(site_name)
+    plan = get_plan(config)
+    title = row['title'] or "N/A"
+    url = metrics.timed("url", event_url_from_href, row['href'], plan)
+    date, event_time = metrics.timed("date", date_and_time_from_row, row['date_text'], plan)
+    known = known_event(site_name, title, url, date, event_time)
+    if known:
+        return Event.from_mapping(known)
+
+    event = structured_match(structured_by_url, url)
+    if event:
+        event = Event.from_mapping(event)
+        if event['image_url'] == "N/A":
+            event['image_url'] = metrics.timed("image", image_url_from_raw, row['image'], plan)
+        return event
+
+    event = Event()
+    event['title'] = title
+    event['details'] = row['details'] or "N/A"
+    event['date'], event['time'] = date, event_time
+    event['location'] = " | ".join(row['locations']) if row['locations'] else "N/A"
+    event['url'] = url
+    event['image_url'] = metrics.timed("image", image_url_from_raw, row['image'], plan)
+    return event
+
+
+####################
+# EXTRACTION PLANS
+####################
+
+# "parse_method" in a site's "event_url" config -> (item, title_element, base_url, selector) -> url
+URL_EXTRACTORS = {
+    "title": url_from_title,
+    "tag": url_from_tag,
+}
+DATE_EXTRACT_METHODS = ("attrs", "tag")
+# "parse_method" in a site's "img" config -> the function reading it and the config keys bound to it
+IMAGE_EXTRACTORS = {
+    "lazy-src": (image_lazy_src, ()),
+    "srcset_220w": (image_srcset_220w, ("tag", "attr")),
+    "style_background": (image_style_background, ()),
+    "none": (image_attr, ("tag", "attr")),
+}
+
+def selector_parts(selector):
+    # {tag: attrs} -> (tag, attrs); None for an empty selector
+    if not selector:
+        return None
+    tag, attrs = next(iter(selector.items()))
+    return tag, attrs or {}
+
+def selector_problem(selector, required=False):
+    if not selector:
+        return "is required" if required else None
+    if not isinstance(selector, dict):
+        return f"should be a {{tag: attrs}} dict, not {selector!r}"
+    tag, attrs = next(iter(selector.items()))
+    if not isinstance(tag, str) or not isinstance(attrs, dict):
+        return f"should be a {{tag: attrs}} dict, not {selector!r}"
+    return None
+
+def config_problems(config):
+    # everything in a SITES entry the extractors can't run, as readable messages
+    problems = []
+    for field, required in (('content_list_class', True), ('item_attr', True), ('title', False),
+                            ('location', False), ('details', False), ('recurrence', False), ('category', False)):
+        problem = selector_problem(config.get(field), required)
+        if problem:
+            problems.append(f"{field} {problem}")
+
+    url_config = config.get('event_url', {})
+    url_method = url_config.get('parse_method')
+    if url_method is not None and url_method not in URL_EXTRACTORS:
+        problems.append(f"event_url parse_method {url_method!r} is not one of {list(URL_EXTRACTORS)}")
+    if url_method == "tag" and not url_config.get('tag'):
+        problems.append("event_url with parse_method 'tag' needs a tag")
+
+    date_config = config.get('date', {})
+    if date_config.get('tag'):
+        if date_config.get('extract_method') not in DATE_EXTRACT_METHODS:
+            problems.append(f"date extract_method {date_config.get('extract_method')!r} is not one of {list(DATE_EXTRACT_METHODS)}")
+        if date_config.get('parse_method') not in DATE_PARSERS:
+            problems.append(f"date parse_method {date_config.get('parse_method')!r} is not one of {list(DATE_PARSERS)}")
+
+    img_config = config.get('img', {})
+    if img_config:
+        image_method = img_config.get('parse_method')
+        if image_method not in IMAGE_EXTRACTORS:
+            problems.append(f"img parse_method {image_method!r} is not one of {list(IMAGE_EXTRACTORS)}")
+        elif image_method == 'lazy-src':
+            problem = selector_problem(img_config, required=True)
+            if problem:
+                problems.append(f"img {problem}")
+        else:
+            problem = selector_problem(img_config.get('container'), required=True)
+            if problem:
+                problems.append(f"img container {problem}")
+            missing = [key for key in IMAGE_EXTRACTORS[image_method][1] if not img_config.get(key)]
+            if missing:
+                problems.append(f"img parse_method {image_method!r} needs {missing}")
+    return problems
+
+class ExtractionPlan:
+    """A SITES entry resolved once: (tag, attrs) selectors and the parse methods bound to their functions"""
+
+    def __init__(self, config):
+        self.content_list = selector_parts(config['content_list_class'])
+        self.item = selector_parts(config['item_attr'])
+        self.title = selector_parts(config.get('title'))
+
+        url_config = config.get('event_url', {})
+        self.url_method = url_config.get('parse_method')
+        self.base_url = url_config.get('base_url', '')
+        url_extractor = URL_EXTRACTORS.get(self.url_method)
+        url_selector = (url_config.get('tag'), url_config.get('attrs', {}))
+        self.url = partial(url_extractor, base_url=self.base_url, selector=url_selector) if url_extractor else None
+
+        date_config = config.get('date', {})
+        date_tag = date_config.get('tag')
+        date_attrs = date_config.get('attrs') if date_config.get('extract_method') == "attrs" else None
+        self.date = (date_tag, date_attrs or {}) if date_tag else None
+        self.date_method = date_config.get('parse_method')
+        date_parser = DATE_PARSERS.get(self.date_method)
+        self.parse_date = date_parser or (lambda date_text: ("N/A", "N/A"))
+
+        img_config = config.get('img', {})
+        self.image_method = img_config.get('parse_method')
+        self.image = None
+        if img_config and self.image_method in IMAGE_EXTRACTORS:
+            image_extractor, keys = IMAGE_EXTRACTORS[self.image_method]
+            selector = selector_parts(img_config) if self.image_method == 'lazy-src' else selector_parts(img_config['container'])
+            image_args = (selector, *(img_config[key] for key in keys))
+            self.image = lambda item: image_extractor(item, *image_args)
+
+        location = {key: value for key, value in config.get('location', {}).items() if key != 'parent'}
+        self.location = selector_parts(location)
+        self.location_parent = config.get('location', {}).get('parent', {}).get('class')
+        self.details = selector_parts(config.get('details'))
+        self.recurrence = selector_parts(config.get('recurrence'))
+        self.category = selector_parts(config.get('category'))
+
+        # every selector the extractors look up inside an item, grouped by the tag names it can match
+        lookups = [self.title, self.date, self.location, self.details, self.recurrence, self.category]
+        lookups.append(url_selector if self.url_method == "tag" else None)
+        lookups.append(image_args[0] if self.image else None)
+        lookups.append(('div', {'class': self.location_parent}) if self.location_parent else None)
+        self.index_matchers = {}
+        for tag, attrs in filter(None, lookups):
+            key = selector_key(tag, attrs)
+            strainer = SoupStrainer(tag, attrs=attrs)
+            matches = getattr(strainer, 'match', None) or strainer.search_tag  # bs4 < 4.13 calls it search_tag
+            for name in ([tag] if isinstance(tag, str) else list(tag)):
+                entries = self.index_matchers.setdefault(name, [])
+                if key not in [entry[0] for entry in entries]:
+                    entries.append((key, matches))
+
+def selector_key(tag, attrs):
+    # hashable form of a find(tag, **attrs) call; class_ and class are the same lookup
+    tag_key = tag if isinstance(tag, str) else tuple(tag)
+    return tag_key, tuple(sorted(('class' if key == 'class_' else key, value) for key, value in attrs.items()))
+
+class ItemIndex:
+    """One walk over an item's descendants, bucketed by the plan's selectors so each field is a dict lookup"""
+
+    __slots__ = ('item', 'buckets', 'errors')
+
+    def __init__(self, item, plan):
+        self.item = item
+        self.buckets = {}
+        self.errors = {}
+        for element in item.descendants:
+            if not isinstance(element, Tag):
+                continue
+            for key, matches in plan.index_matchers.get(element.name, ()):
+                if key in self.errors:
+                    continue
+                try:
+                    if matches(element):
+                        self.buckets.setdefault(key, []).append(element)
+                except Exception as e:
+                    # BeautifulSoup would raise this from find(), so the field's own error handling sees it there
+                    self.errors[key] = e
+        for entries in plan.index_matchers.values():
+            for key, matches in entries:
+                self.buckets.setdefault(key, [])
+
+    def find_all(self, name=None, attrs=None, **kwargs):
+        key = selector_key(name, {**(attrs or {}), **kwargs})
+        if key in self.errors:
+            raise self.errors[key]
+        if key not in self.buckets:
+            return self.item.find_all(name, attrs or {}, **kwargs)
+        return self.buckets[key]
+
+    def find(self, name=None, attrs=None, **kwargs):
+        key = selector_key(name, {**(attrs or {}), **kwargs})
+        if key in self.errors:
+            raise self.errors[key]
+        if key not in self.buckets:
+            return self.item.find(name, attrs or {}, **kwargs)
+        bucket = self.buckets[key]
+        return bucket[0] if bucket else None
+
+    def __str__(self):
+        return str(self.item)
+
+def index_item(item, plan):
+    # lexbor nodes answer CSS lookups in C already, so only soup items get an index
+    return ItemIndex(item, plan) if execute_item_index and isinstance(item, Tag) else item
+
+def compile_plans(sites):
+    # validates every site up front; a bad entry stops the run instead of turning into rows of "N/A"
+    problems = [f"{site_name}: {problem}" for site_name, config in sites.items() for problem in config_problems(config)]
+    if problems:
+        raise ValueError("Invalid SITES configuration:\n  " + "\n  ".join(problems))
+    return {site_name: get_plan(config) for site_name, config in sites.items()}
+
+def get_plan(config):
+    # the plan is stored on the config itself, so the per-site and per-page copies made from it
+    # ({**config, "url": ...}) share it, and it goes away with the config instead of piling up in a cache
+    plan = config.get("_plan")
+    if plan is None:
+        problems = config_problems(config)
+        if problems:
+            raise ValueError(f"Invalid site config: {'; '.join(problems)}")
+        plan = config["_plan"] = ExtractionPlan(config)
+    return plan
 
 
 ####################
 # main extraction
 ####################
 
-def extract_events(parsed_content, config):
+def structured_enabled(config):
+    return execute_structured_data and config.get("jsonld") is not False
+
+def structured_events(blocks):
+    events = map_jsonld_events(blocks)
+    return [event for event in events if event['title'] != "N/A" and event['date'] != "N/A"]
+
+def extract_structured_events(html_content, config):
+    # schema.org Event JSON-LD, read from the pages' script tags only (no full DOM walk)
+    if not structured_enabled(config):
+        return []
+    pages = html_content if isinstance(html_content, list) else [html_content]
+    return structured_events([block for page in pages for block in find_jsonld_events(page)])
+
+def index_structured(structured):
+    return {normalize_url(event['url']): event for event in structured if event['url'] != "N/A"}
+
+def structured_match(structured_by_url, url):
+    # the JSON-LD record for a listing item, matched on its event URL
+    if not structured_by_url or not url or url == "N/A":
+        return None
+    return structured_by_url.get(normalize_url(url))
+
+def find_content_list(parsed_content, config):
+    plan = get_plan(config)
+    return find_one(parsed_content, plan.content_list) if plan.content_list[1] else parsed_content
+
+def find_items(content_list, config):
+    return find_every(content_list, get_plan(config).item)
+
+def extract_item(item, plan, site_name=None, structured_by_url=None):
+    tracer.begin(site_name)
+    metrics.begin(site_name)
+    item = metrics.timed("index", index_item, item, plan)
+    title, title_element = metrics.timed("title", extract_title, item, plan)
+    url = metrics.timed("url", extract_event_url, item, title_element, plan)
+    known, date_and_time = cached_event(site_name, item, title, url, plan)
+    if known:
+        return Event.from_mapping(known)
+
+    event = structured_match(structured_by_url, url)
+    if event:
+        event = Event.from_mapping(event)
+        if event['image_url'] == "N/A":
+            event['image_url'] = metrics.timed("image", extract_image_url, item, plan)
+        return event
+
+    event = Event()
+    event['title'] = title
+    event['details'] = metrics.timed("details", extract_details, item, plan)
+    event['date'], event['time'] = date_and_time or metrics.timed("date", extract_date_and_time, item, plan)
+    event['location'] = metrics.timed("location", extract_location, item, plan)
+    event['url'] = url
+    event['image_url'] = metrics.timed("image", extract_image_url, item, plan)
+    
+    # event['recurrence'] = extract_recurrence(item, plan)
+    # event['category'] = extract_category(item, plan)
+    
+    return event
+
+def extract_events(parsed_content, config, site_name=None, structured=None):
     events = []
-    content_list_tag, content_list_attrs = next(iter(config['content_list_class'].items()))
-    content_list = parsed_content.find(content_list_tag, **content_list_attrs) if content_list_attrs else parsed_content
+    # structured (JSON-LD) events stand in for the selector path wherever they cover an item
+    structured = structured or []
+    structured_by_url = index_structured(structured)
+    plan = get_plan(config)
+    content_list = find_content_list(parsed_content, config)
     
     if not content_list:
+        if structured:
+            logging.info(f"No content list, using {len(structured)} JSON-LD events")
+            return [Event.from_mapping(event) for event in structured]
         logging.error("Couldn't find content list")
         return events
 
-    item_tag, item_attrs = next(iter(config['item_attr'].items()))
-    items = content_list.find_all(item_tag, **item_attrs) if item_attrs else content_list.find_all(item_tag)
+    items = find_items(content_list, config)
+
+    if use_process_pool(items, site_name):
+        return extract_in_processes(items, plan, site_name, structured_by_url)
 
     for item in items:
-        title, title_element = extract_title(item, config)
-        event = {}
-        event['title'] = title
-        event['details'] = extract_details(item, config)        
-        event['date'], event['time'] = extract_date_and_time(item, config)
-        event['location'] = extract_location(item, config)
-        event['url'] = extract_event_url(item, title_element, config)
-        event['image_url'] = extract_image_url(item, config)
-        
-        # event['recurrence'] = extract_recurrence(item, config)
-        # event['category'] = extract_category(item, config)
-        
-        events.append(event)
+        events.append(extract_item(item, plan, site_name, structured_by_url))
     
     return events
- 
 
 
+####################
+# PROCESS EXTRACTION
+####################
+
+# Workers are spawned, not forked: extraction runs on a pipeline thread while the fetch threads and the
+# browser pool are busy, and a forked child would inherit whatever locks they held at that moment.
+# A spawned worker starts from a fresh import of this script, so each chunk is sent as its items' markup
+# and re-parsed there (with html.parser, which keeps the fragment's top-level tags as they are).
+
+def use_process_pool(items, site_name):
+    # workers look the site's selectors up in SITES, so other configs are extracted in-process
+    return (execute_process_extract and site_name in SITES and len(items) >= PROCESS_EXTRACT_THRESHOLD
+            and PROCESS_EXTRACT_WORKERS >= 2)
+
+def chunk_bounds(count, chunk_size):
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+def init_extract_worker(fingerprint_file):
+    # main() never runs in a worker, so the run's incremental store is opened again from its file
+    global fingerprint_store
+    fingerprint_store = FingerprintStore(fingerprint_file) if fingerprint_file else None
+
+def extract_chunk(site_name, chunk_html, count, structured_by_url):
+    # a worker is handed several chunks, so it counts each one from zero
+    items = [element for element in BeautifulSoup(chunk_html, 'html.parser').contents if isinstance(element, Tag)]
+    if len(items) != count:
+        raise ValueError(f"chunk re-parsed into {len(items)} items instead of {count}")
+    plan = get_plan(SITES[site_name])
+    metrics.reset()
+    events = [extract_item(item, plan, site_name, structured_by_url) for item in items]
+    return events, metrics.snapshot()
+
+def extract_in_processes(items, plan, site_name, structured_by_url=None):
+    # chunks of items extracted in spawned workers; map() hands the results back in item order
+    start_time = time.perf_counter()
+    chunks = [items[start:end] for start, end in chunk_bounds(len(items), PROCESS_EXTRACT_CHUNK)]
+    workers = min(PROCESS_EXTRACT_WORKERS, len(chunks))
+    fingerprint_file = fingerprint_store.path if fingerprint_store else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_extract_worker, initargs=(fingerprint_file,)) as executor:
+            results = list(executor.map(extract_chunk, repeat(site_name), ["".join(map(str, chunk)) for chunk in chunks],
+                                        map(len, chunks), repeat(structured_by_url)))
+        events = [event for chunk_events, chunk_metrics in results for event in chunk_events]
+        for chunk_events, chunk_metrics in results:
+            metrics.merge(chunk_metrics)
+    except Exception as e:
+        logging.error(f"Process extraction failed, extracting in-process: {e}")
+        events = [extract_item(item, plan, site_name, structured_by_url) for item in items]
+    logging.info(f"Extracted {len(items)} items in {len(chunks)} chunks across {workers} processes "
+                 f"in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+    return events
+
 
 ####################
 # EXECUTION
 ####################
 
 def create_all_events_dataframe(all_events):
-    all_df = pd.DataFrame()
+    # one column builder for every site, so the frame is built once instead of concatenated per site
+    columns = EventColumns()
     for site_name, events in all_events.items():
-        df = pd.DataFrame(events)
-        df['source'] = site_name
-        all_df = pd.concat([all_df, df], ignore_index=True)
-    return all_df
+        columns.extend(events, source=site_name)
+    return columns.to_dataframe()
 
 def save_all_events_to_csv(all_df, filename="all_events.csv"):
     filepath = os.path.join(DATA_FOLDER, filename)  
     all_df.to_csv(filepath, index=False)
 
-def main():
-    all_events = {}
-    for site_name, config in SITES.items():
-        url = config["url"]
-        logging.info("#" * 80)
-        logging.info(f"Fetching and parsing {site_name}")
-        logging.info("#" * 80)
-        html_content, driver = fetch_page(url)
-        if html_content:
-            if execute_debugging:
-                logging.info("=" * 80)
-                grid_search(html_content)
-                logging.info("=" * 80)
-                find_iframes(html_content)
-                logging.info("=" * 80)
-                # check_shadow_dom(driver)
-                # find_potential_containers(parsed_content)
-                # capture_network_requests(site_name, driver)
-                save_html(html_content, site_name)
-            parsed_content = parse_html(html_content)
-            if execute_save_html:
-                save_parsed(parsed_content, site_name)
-
-            events = extract_events(parsed_content, config)
-            all_events[site_name] = events
-
-            if execute_save_events_to_csv:
-                save_events_to_csv(events, site_name)
-
-            logging.info(f"Extracted {len(events)} events from {site_name}")
-            for event in events:
-                logging.info(f"Title: {event.get('title')}")
-                logging.info(f"Image URL: {event.get('image_url')}")
-
-                logging.info("-" * 40)
+def merge_pages(parsed_pages, config):
+    # moves every later page's items into the first page's content list, in page order
+    merged = parsed_pages[0]
+    content_list = find_content_list(merged, config)
+    if not content_list:
+        return merged
+    for parsed_page in parsed_pages[1:]:
+        page_list = find_content_list(parsed_page, config)
+        for item in find_items(page_list, config) if page_list else []:
+            content_list.append(item.extract())
+    return merged
+
+def parse_site(site_name, config, html_content, driver=None):
+    logging.info("#" * 80)
+    logging.info(f"Parsing {site_name}")
+    logging.info("#" * 80)
+    # paginated sites hand over a list of pages
+    pages = html_content if isinstance(html_content, list) else [html_content]
+    html_content = pages[0]
+    if execute_debugging:
+        logging.info("=" * 80)
+        grid_search(html_content)
+        logging.info("=" * 80)
+        find_iframes(html_content)
+        logging.info("=" * 80)
+        # check_shadow_dom(driver)
+        # find_potential_containers(parsed_content)
+        # capture_network_requests(site_name, driver)
+        save_html(html_content, site_name)
+    parsed_content = merge_pages([parse_subtree(page, config) for page in pages], config)
+    if execute_save_html:
+        save_parsed(parsed_content, site_name)
+    return parsed_content
+
+def extract_site(site_name, config, parsed_content, structured=None):
+    events = extract_events(parsed_content, config, site_name, structured)
+
+    logging.info(f"Extracted {len(events)} events from {site_name}")
+    for event in events:
+        logging.info(f"Title: {event.get('title')}")
+        logging.info(f"Image URL: {event.get('image_url')}")
+
+        logging.info("-" * 40)
 
-        else:
+    return events
+
+def store_site(site_name, events):
+    events = remember_events(site_name, events)
+    if execute_save_events_to_csv and events:
+        save_events_to_csv(events, site_name)
+    return events
+
+####################
+# ORCHESTRATION
+####################
+
+PIPELINE_STAGES = ["fetch", "parse", "extract", "enrich", "store"]
+PIPELINE_QUEUE_SIZE = 2     # sites allowed to wait between two stages before the upstream stage blocks
+STOP = object()             # end-of-input marker passed down the stage queues
+
+class StageMetrics:
+    """Busy time, item count and queue depth for one pipeline stage"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.depths = []
+
+    def summary(self, wall_seconds):
+        occupancy = self.busy / (self.workers * wall_seconds) if wall_seconds else 0.0
+        mean_depth = sum(self.depths) / len(self.depths) if self.depths else 0.0
+        return {
+            "items": self.items,
+            "workers": self.workers,
+            "busy_seconds": round(self.busy, 3),
+            "occupancy": round(occupancy, 3),
+            "max_queue_depth": max(self.depths, default=0),
+            "mean_queue_depth": round(mean_depth, 2),
+        }
+
+class Orchestrator:
+    """Runs sites through fetch -> parse -> extract -> enrich -> store -> render stages joined by bounded queues"""
+
+    def __init__(self, sites, workers=FETCH_WORKERS, snapshots=None, replay_run=None, output_file="all_events.csv"):
+        self.sites = sites
+        self.workers = workers
+        # with a replay run the fetch stage reads stored snapshots and no browser is ever started
+        self.snapshots = snapshots
+        self.replay_run = replay_run
+        self.output_file = output_file
+        self.pool = get_browser_pool(size=workers)
+        # selenium and requests block, so network stages run on threads the loop awaits
+        self.network_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        # parse/extract/store are CPU-bound; one worker keeps them off the loop and keeps the stores single-writer
+        self.cpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract")
+        self.stage_workers = {"fetch": workers, "parse": 1, "extract": 1, "enrich": workers, "store": 1}
+        self.metrics = {stage: StageMetrics(stage, self.stage_workers[stage]) for stage in PIPELINE_STAGES}
+        self.all_events = {}
+        self.all_events_df = None
+
+    async def fetch(self, site_name):
+        loop = asyncio.get_running_loop()
+        config = self.sites[site_name]
+        if self.replay_run:
+            html_content = await loop.run_in_executor(self.network_executor, self.snapshots.load_site, self.replay_run, site_name)
+            if not html_content:
+                logging.info(f"No snapshot of {site_name} in run {self.replay_run['run_id']}")
+                return None
+            return {"site": site_name, "html": html_content, "events": None}
+
+        logging.info(f"Fetching {site_name}")
+        # the name rides along into every page's config copy, so an early stop can be credited to the site
+        site_config = {**config, "site_name": site_name}
+        html_content, feed_events = await loop.run_in_executor(self.network_executor, fetch_site_content, site_config, self.pool)
+        if html_content and self.snapshots:
+            await loop.run_in_executor(self.network_executor, self.snapshots.record_site, site_name, config["url"], html_content)
+        if feed_events is not None:
+            # feed and browser-read sites skip parse and extract; their html (if any) was only for the snapshot
+            logging.info(f"Read {len(feed_events)} events from {site_name} without parsing the page")
+            return {"site": site_name, "html": None, "events": feed_events}
+        if not html_content:
             logging.error(f"Failed to fetch or parse the content from {site_name}")
+            return None
+        return {"site": site_name, "html": html_content, "events": None}
+
+    async def parse(self, job):
+        # feed sites already have their events and pass straight through to store
+        if job["events"] is None:
+            loop = asyncio.get_running_loop()
+            config = self.sites[job["site"]]
+            job["structured"] = await loop.run_in_executor(self.cpu_executor, extract_structured_events, job["html"], config)
+            job["parsed"] = await loop.run_in_executor(self.cpu_executor, parse_site, job["site"], config, job.pop("html"))
+        return job
+
+    async def extract(self, job):
+        if job["events"] is None:
+            loop = asyncio.get_running_loop()
+            job["events"] = await loop.run_in_executor(self.cpu_executor, extract_site, job["site"], self.sites[job["site"]],
+                                                       job.pop("parsed"), job.pop("structured"))
+        return job
+
+    async def enrich(self, job):
+        # detail pages are network-bound, so they share the fetch threads
+        enrich_config = self.sites[job["site"]].get("enrich")
+        if detail_cache and enrich_config and job["events"]:
+            loop = asyncio.get_running_loop()
+            job["events"] = await loop.run_in_executor(self.network_executor, enrich_events, job["site"], job["events"], enrich_config, detail_cache)
+        return job
+
+    async def store(self, job):
+        loop = asyncio.get_running_loop()
+        self.all_events[job["site"]] = await loop.run_in_executor(self.cpu_executor, store_site, job["site"], job["events"])
+        return job["site"]
+
+    def render(self):
+        # runs once every site is stored, after the stages have drained
+        # SITES order, not completion order, so the output stays deterministic
+        ordered = {site_name: self.all_events[site_name] for site_name in self.sites if site_name in self.all_events}
+        self.all_events_df = create_all_events_dataframe(ordered)
+        save_all_events_to_csv(self.all_events_df, self.output_file)
+
+    async def stage_worker(self, stage, inbox, outbox):
+        handler = getattr(self, stage)
+        metrics = self.metrics[stage]
+        while True:
+            job = await inbox.get()
+            metrics.depths.append(inbox.qsize())
+            if job is STOP:
+                return
+            start = time.perf_counter()
+            try:
+                result = await handler(job)
+            except Exception as e:
+                logging.error(f"{stage} stage failed: {e}")
+                result = None
+            metrics.busy += time.perf_counter() - start
+            metrics.items += 1
+            if result is not None and outbox is not None:
+                await outbox.put(result)  # waits while the next stage is behind, which is the backpressure
+
+    async def run(self):
+        start = time.perf_counter()
+        # the fetch inbox holds every site up front; the queues between stages are bounded
+        inboxes = [asyncio.Queue()] + [asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE) for stage in PIPELINE_STAGES[1:]]
+        tasks = []
+        for i, stage in enumerate(PIPELINE_STAGES):
+            outbox = inboxes[i + 1] if i + 1 < len(inboxes) else None
+            tasks.append([asyncio.create_task(self.stage_worker(stage, inboxes[i], outbox)) for n in range(self.stage_workers[stage])])
+
+        for site_name in self.sites:
+            inboxes[0].put_nowait(site_name)
+        for i, stage in enumerate(PIPELINE_STAGES):
+            for n in range(self.stage_workers[stage]):
+                await inboxes[i].put(STOP)
+            await asyncio.gather(*tasks[i])
+
+        render_start = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(self.cpu_executor, self.render)
+        self.report(time.perf_counter() - start, time.perf_counter() - render_start)
+        return self.all_events
+
+    def report(self, wall_seconds, render_seconds):
+        logging.info(f"Pipeline finished in {wall_seconds:.1f} s (table and CSV built in {render_seconds:.2f} s)")
+        for stage in PIPELINE_STAGES:
+            summary = self.metrics[stage].summary(wall_seconds)
+            logging.info(f"  {stage:<8} items={summary['items']:<3} busy={summary['busy_seconds']:.2f}s "
+                         f"occupancy={summary['occupancy']:.0%} queue max={summary['max_queue_depth']} "
+                         f"mean={summary['mean_queue_depth']}")
+
+    def close(self):
+        self.network_executor.shutdown()
+        self.cpu_executor.shutdown()
+        self.pool.close()
+
+async def run_all(sites):
+    global fingerprint_store, fetch_stats, detail_cache
+    if execute_incremental:
+        fingerprint_store = FingerprintStore(FINGERPRINT_FILE)
+    if execute_enrichment:
+        detail_cache = DetailCache(DETAIL_CACHE_FILE, DETAIL_TTL_DAYS)
+    fetch_stats = FetchProfileStats(FETCH_STATS_FILE)
+    set_host_limiter(HostRateLimiter(rate=HOST_RATE_PER_SECOND, burst=HOST_BURST, concurrency=PER_DOMAIN_LIMIT,
+                                      max_in_flight=FETCH_WORKERS))
+    snapshots = SnapshotStore() if execute_snapshots else None
+    if snapshots:
+        snapshots.start_run()
+
+    sites = with_api_sources(sites)
+    workers = FETCH_WORKERS if execute_concurrent_fetch else 1
+    logging.info(f"Fetching {len(sites)} sites with {workers} workers")
+    orchestrator = Orchestrator(sites, workers, snapshots)
+    try:
+        all_events = await orchestrator.run()
+    finally:
+        orchestrator.close()
+
+    if fingerprint_store:
+        fingerprint_store.save()
+    if detail_cache:
+        detail_cache.save()
+    fetch_stats.report()
+    if snapshots:
+        snapshots.save_run()
+    return all_events
+
+async def replay(sites, run_id=None):
+    # re-runs parse_html/extract_events over a stored run without touching the network
+    global fingerprint_store, detail_cache
+    fingerprint_store = None  # reusing stored records would hide selector changes
+    detail_cache = None       # no detail page fetches either
+    snapshots = SnapshotStore()
+    run = snapshots.load_run(run_id)
+    logging.info(f"Replaying snapshot run {run['run_id']} ({run['started']})")
+    orchestrator = Orchestrator(sites, FETCH_WORKERS, snapshots, replay_run=run, output_file=REPLAY_CSV)
+    try:
+        return await orchestrator.run()
+    finally:
+        orchestrator.close()
+
+def discover(sites, site_names=None):
+    # one browser pass per site; found endpoints are written to API_SOURCES_FILE for later runs
+    set_host_limiter(HostRateLimiter(rate=HOST_RATE_PER_SECOND, burst=HOST_BURST, concurrency=PER_DOMAIN_LIMIT,
+                                      max_in_flight=FETCH_WORKERS))
+    api_sources = load_api_sources(API_SOURCES_FILE)
+    pool = get_browser_pool(size=1)
+    found = {}
+    try:
+        for site_name in site_names or sites:
+            if site_name not in sites:
+                logging.error(f"No site named {site_name} in SITES")
+                continue
+            spec = discover_api_source(site_name, sites[site_name], pool)
+            if spec:
+                api_sources[site_name] = found[site_name] = spec
+    finally:
+        pool.close()
+    save_api_sources(API_SOURCES_FILE, api_sources)
+    return found
 
-    # Create a single dataframe with all events
-    all_events_df = create_all_events_dataframe(all_events)
-    
-    # Save the dataframe to a CSV file
-    save_all_events_to_csv(all_events_df)
+def saved_pages(sites, run_id=None):
+    # a snapshot run's pages (the latest by default), else the logs/<site>.html copies save_html leaves
+    snapshots = SnapshotStore()
+    try:
+        run = snapshots.load_run(run_id)
+    except (OSError, ValueError):
+        run = None
+    pages = {}
+    for site_name in sites:
+        html_content = snapshots.load_site(run, site_name) if run else None
+        log_copy = os.path.join(LOG_FOLDER, f"{site_name}.html")
+        if html_content is None and os.path.exists(log_copy):
+            with open(log_copy, encoding='utf-8') as f:
+                html_content = f.read()
+        if html_content:
+            pages[site_name] = html_content
+    return pages
+
+def benchmark_parsers(sites, run_id=None, rounds=BENCH_ROUNDS):
+    # best-of-rounds parse and extract time per backend on saved pages, checked against html.parser's events
+    global fingerprint_store
+    fingerprint_store = None
+    results = []
+    logging.disable(logging.INFO)  # the extractors log every field, which would swamp the timings
+    try:
+        for site_name, html_content in saved_pages(sites, run_id).items():
+            config = sites[site_name]
+            pages = html_content if isinstance(html_content, list) else [html_content]
+            baseline = None
+            # whole-page parses for every backend, then content-list-only parses for the soup backends
+            variants = [(backend, False) for backend in available_backends()]
+            variants += [(backend, True) for backend in available_backends() if backend != "selectolax"]
+            for backend, subtree in variants:
+                parse = (lambda page: parse_subtree(page, config, backend)) if subtree else (lambda page: parse_html(page, backend))
+                parse_times, extract_times = [], []
+                for n in range(rounds):
+                    start = time.perf_counter()
+                    parsed_content = merge_pages([parse(page) for page in pages], config)
+                    parse_times.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    events = extract_events(parsed_content, config)
+                    extract_times.append(time.perf_counter() - start)
+                # peak memory gets its own untimed pass, tracemalloc slows parsing down considerably;
+                # it only sees Python allocations, so lexbor's C-side tree isn't counted
+                del parsed_content
+                tracemalloc.start()
+                parsed_content = merge_pages([parse(page) for page in pages], config)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del parsed_content
+                baseline = events if baseline is None else baseline
+                results.append({
+                    "site": site_name,
+                    "backend": f"{backend}{' subtree' if subtree else ''}",
+                    "kb": sum(len(page) for page in pages) // 1024,
+                    "parse_ms": min(parse_times) * 1000,
+                    "extract_ms": min(extract_times) * 1000,
+                    "peak_kb": peak // 1024,
+                    "events": len(events),
+                    "same_events": events == baseline,
+                })
+    finally:
+        logging.disable(logging.NOTSET)
+
+    for result in results:
+        line = (f"{result['site']:<20} {result['backend']:<20} {result['kb']:>5} KB  parse {result['parse_ms']:8.1f} ms  "
+                f"extract {result['extract_ms']:8.1f} ms  peak {result['peak_kb']:>6} KB  "
+                f"{result['events']:>4} events{'' if result['same_events'] else '  (differs)'}")
+        logging.info(line)
+        print(line)
+    return results
+
+def report_extract_metrics(kind):
+    # replays are only compared with replays: same pages, so any change is the extractors' doing
+    if not execute_extract_metrics:
+        return
+    summary, found = save_run(EXTRACT_METRICS_FILE, metrics, kind)
+    logging.info(f"Extraction metrics: {json.dumps(summary)}")
+    for regression in found:
+        logging.warning(f"Extraction regression: {regression}")
+    print(f"Extraction metrics for {len(summary)} sites saved to {EXTRACT_METRICS_FILE}"
+          f"{f', {len(found)} regressions since the last {kind} run (see log)' if found else ''}")
+
+def main(argv=None):
+    compile_plans(SITES)  # fail fast on a bad SITES entry, before any browser or network work
+    arg_parser = argparse.ArgumentParser(description="Scrape Chattanooga event listings into data/all_events.csv")
+    arg_parser.add_argument("--replay", nargs="?", const="latest", metavar="RUN_ID",
+                            help=f"extract from stored snapshots (the latest run by default) into data/{REPLAY_CSV}, no browser")
+    arg_parser.add_argument("--discover", nargs="*", metavar="SITE",
+                            help=f"record the JSON endpoints each site (or the named ones) loads into data/{os.path.basename(API_SOURCES_FILE)}")
+    arg_parser.add_argument("--bench-parsers", nargs="?", const="latest", metavar="RUN_ID",
+                            help="time each parser backend on saved pages (a snapshot run, else logs/<site>.html)")
+    args = arg_parser.parse_args(argv)
+
+    if args.bench_parsers:
+        benchmark_parsers(SITES, None if args.bench_parsers == "latest" else args.bench_parsers)
+    elif args.discover is not None:
+        found = discover(SITES, args.discover)
+        print(f"Found API sources for {len(found)} sites: {', '.join(found) or 'none'}")
+    elif args.replay:
+        all_events = asyncio.run(replay(SITES, None if args.replay == "latest" else args.replay))
+        print(f"Replayed {sum(len(events) for events in all_events.values())} events into {os.path.join(DATA_FOLDER, REPLAY_CSV)}")
+        report_extract_metrics("replay")
+    else:
+        asyncio.run(run_all(SITES))
+        report_extract_metrics("scrape")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+####################
+# CONFIGURATION
+####################
+
+LATENCY_BUCKETS_US = (10, 50, 100, 500, 1000, 5000, 10000)   # histogram upper bounds per field call
+MISSING = ("N/A", "Unexpected input.", "")
+HISTORY_RUNS = 30           # runs kept in the metrics file
+MIN_CALLS = 100             # fields called fewer times than this are not compared between runs
+SLOWER_RATIO = 2.0          # mean time per call this much above the last run is flagged...
+SLOWER_MIN_US = 20          # ...if it also grew by at least this many microseconds
+MISSING_RATE_JUMP = 0.2     # an N/A rate this much above the last run is flagged
+
+
+def is_missing(value):
+    # extractors return a string, a (value, element) / (date, time) tuple or a list of strings
+    if isinstance(value, tuple):
+        value = value[0]
+    elif isinstance(value, list):
+        value = value[0] if value else "N/A"
+    return isinstance(value, str) and value in MISSING
+
+
+####################
+# FIELD STATS
+####################
+
+class FieldStats:
+    """Calls, time, N/A results, exceptions and a latency histogram for one site's field"""
+
+    __slots__ = ('calls', 'seconds', 'missing', 'errors', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.missing = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_US) + 1)
+
+    def record(self, seconds, missing):
+        self.calls += 1
+        self.seconds += seconds
+        self.missing += missing
+        micros = seconds * 1e6
+        for index, bound in enumerate(LATENCY_BUCKETS_US):
+            if micros <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.missing += other.missing
+        self.errors += other.errors
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    def summary(self):
+        labels = [f"<={bound}us" for bound in LATENCY_BUCKETS_US] + [f">{LATENCY_BUCKETS_US[-1]}us"]
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.seconds * 1000, 3),
+            "mean_us": round(self.seconds * 1e6 / self.calls, 2) if self.calls else 0.0,
+            "missing": self.missing,
+            "missing_rate": round(self.missing / self.calls, 4) if self.calls else 0.0,
+            "errors": self.errors,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+####################
+# RUN METRICS
+####################
+
+class ExtractMetrics:
+    """Per-site field stats and date parse_method branch counts for one run"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.fields = {}        # (site, field) -> FieldStats
+        self.branches = {}      # (site, branch) -> count
+        self._local = threading.local()
+
+    def begin(self, site):
+        # calls on other threads (browser rows, known-run checks) have no site and are not counted
+        self._local.site = site
+
+    def stats(self, field):
+        site = getattr(self._local, 'site', None)
+        if site is None:
+            return None
+        key = (site, field)
+        stats = self.fields.get(key)
+        if stats is None:
+            stats = self.fields[key] = FieldStats()
+        return stats
+
+    def timed(self, field, function, *args):
+        if not self.enabled:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        stats = self.stats(field)
+        if stats is not None:
+            stats.record(elapsed, is_missing(result))
+        return result
+
+    def error(self, field):
+        stats = self.stats(field) if self.enabled else None
+        if stats is not None:
+            stats.errors += 1
+
+    def branch(self, name):
+        site = getattr(self._local, 'site', None)
+        if self.enabled and site is not None:
+            self.branches[(site, name)] = self.branches.get((site, name), 0) + 1
+
+    def reset(self):
+        self.fields = {}
+        self.branches = {}
+
+    def snapshot(self):
+        # plain tuples, so a worker process can send its counts back to be merged
+        return ({key: (stats.calls, stats.seconds, stats.missing, stats.errors, stats.buckets)
+                 for key, stats in self.fields.items()}, dict(self.branches))
+
+    def merge(self, snapshot):
+        fields, branches = snapshot
+        for key, (calls, seconds, missing, errors, buckets) in fields.items():
+            other = FieldStats()
+            other.calls, other.seconds, other.missing, other.errors, other.buckets = calls, seconds, missing, errors, buckets
+            self.fields.setdefault(key, FieldStats()).merge(other)
+        for key, count in branches.items():
+            self.branches[key] = self.branches.get(key, 0) + count
+
+    def summary(self):
+        sites = {}
+        for (site, field), stats in sorted(self.fields.items()):
+            sites.setdefault(site, {"fields": {}, "date_branches": {}})["fields"][field] = stats.summary()
+        for (site, branch), count in sorted(self.branches.items()):
+            sites.setdefault(site, {"fields": {}, "date_branches": {}})["date_branches"][branch] = count
+        return sites
+
+
+####################
+# HISTORY
+####################
+
+def regressions(previous, current):
+    """Fields that got slower, lost values or started raising since the previous run of the same kind"""
+    found = []
+    for site, site_summary in current.items():
+        for field, stats in site_summary["fields"].items():
+            before = previous.get(site, {}).get("fields", {}).get(field)
+            if not before or stats["calls"] < MIN_CALLS or before["calls"] < MIN_CALLS:
+                continue
+            slower = stats["mean_us"] - before["mean_us"]
+            if before["mean_us"] and stats["mean_us"] > before["mean_us"] * SLOWER_RATIO and slower >= SLOWER_MIN_US:
+                found.append(f"{site} {field}: {before['mean_us']:.0f} -> {stats['mean_us']:.0f} us per call")
+            if stats["missing_rate"] - before["missing_rate"] >= MISSING_RATE_JUMP:
+                found.append(f"{site} {field}: N/A rate {before['missing_rate']:.0%} -> {stats['missing_rate']:.0%}")
+            if stats["errors"] and not before["errors"]:
+                found.append(f"{site} {field}: {stats['errors']} exceptions (none last run)")
+    return found
+
+
+def save_run(path, metrics, kind="scrape"):
+    """Append this run's summary to the metrics file and return the regressions against the last one"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = []
+    summary = metrics.summary()
+    previous = next((run["sites"] for run in reversed(history) if run.get("kind") == kind), {})
+    found = regressions(previous, summary)
+    history.append({"run": datetime.now().isoformat(timespec='seconds'), "kind": kind, "sites": summary})
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(history[-HISTORY_RUNS:], f, indent=1)
+    except OSError as e:
+        logging.warning(f"Could not save extraction metrics: {e}")
+    return summary, found
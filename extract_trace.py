@@ -0,0 +1,92 @@
+import logging
+import random
+import threading
+
+####################
+# CONFIGURATION
+####################
+
+# Verbosity, lowest to highest: each level also logs everything below it
+OFF, FAILURES, VALUES, ELEMENTS = range(4)
+LEVELS = {"off": OFF, "failures": FAILURES, "values": VALUES, "elements": ELEMENTS}
+FIELDS = ('title', 'url', 'date', 'image', 'location', 'details', 'recurrence', 'category')
+DUMP_CHARS = 2000           # element dumps are cut to this many characters
+
+logger = logging.getLogger("extract")
+
+
+####################
+# LAZY FORMATTING
+####################
+
+class Dump:
+    """An element that is only turned into (whitespace-collapsed, truncated) markup if the record is emitted"""
+
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def __str__(self):
+        if self.element is None:
+            return "None"
+        text = ' '.join(str(self.element).split())
+        return text if len(text) <= DUMP_CHARS else text[:DUMP_CHARS] + f"... ({len(text)} chars)"
+
+
+####################
+# TRACER
+####################
+
+class Tracer(threading.local):
+    """Per-site, per-field extraction trace; begin() picks the item's levels so each call is one dict lookup"""
+
+    def __init__(self, level="failures", sites=None, fields=None, sample=1.0):
+        self.default = LEVELS[level]
+        self.sites = sites or {}
+        self.fields = fields or {}
+        self.sample = sample
+        self.levels = {}        # site -> (sampled levels, failure-only levels)
+        self.site = None
+        self.active = {}
+
+    def site_levels(self, site):
+        # a TRACE_SITES entry is a level for the whole site or a {field: level} dict
+        cached = self.levels.get(site)
+        if cached is None:
+            site_config = self.sites.get(site, {})
+            site_default = LEVELS[site_config] if isinstance(site_config, str) else self.default
+            site_fields = site_config if isinstance(site_config, dict) else {}
+            full = {}
+            for field in FIELDS:
+                level = site_fields.get(field) or self.fields.get(field)
+                full[field] = LEVELS[level] if level else site_default
+            if not logger.isEnabledFor(logging.INFO):
+                full = {}
+            full = {field: level for field, level in full.items() if level > OFF}
+            failures = {field: FAILURES for field in full}
+            cached = self.levels[site] = (full, failures)
+        return cached
+
+    def begin(self, site):
+        # called once per item; unsampled items still report their failures
+        full, failures = self.site_levels(site)
+        self.site = site
+        self.active = full if self.sample >= 1 or random.random() < self.sample else failures
+
+    def end(self):
+        # back to a fresh thread's state, where nothing is traced until the next begin
+        self.site = None
+        self.active = {}
+
+    def value(self, field, message, *args):
+        if self.active.get(field, OFF) >= VALUES:
+            logger.info("trace site=%s field=%s " + message, self.site, field, *args)
+
+    def element(self, field, name, element):
+        if self.active.get(field, OFF) >= ELEMENTS:
+            logger.info("trace site=%s field=%s %s=%s", self.site, field, name, Dump(element))
+
+    def failure(self, field, reason, element=None):
+        if self.active.get(field, OFF) >= FAILURES:
+            logger.info("trace site=%s field=%s failed=%s element=%s", self.site, field, reason, Dump(element))
@@ -0,0 +1,247 @@
+import html
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urljoin
+
+from dateutil import parser
+
+from http_fetch import fetch_html, fetch_json
+
+####################
+# CONFIGURATION
+####################
+
+FEED_SOURCES = ("tribe_rest", "ical", "api")
+FEED_DAYS = 30          # default date window; override per site with "feed_days"
+FEED_PER_PAGE = 50
+FEED_MAX_PAGES = 20
+FEED_WORKERS = 4        # pages of a paginated feed fetched at once
+
+TAG_RE = re.compile(r'<[^>]+>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+####################
+# HELPERS
+####################
+
+def strip_html(text):
+    """Feed fields carry HTML fragments; flatten them without building a DOM"""
+    if not text:
+        return "N/A"
+    text = WHITESPACE_RE.sub(' ', html.unescape(TAG_RE.sub(' ', text))).strip()
+    return text or "N/A"
+
+
+def format_date_and_time(start, all_day=False):
+    """Same date/time formatting extract_date_and_time produces"""
+    date_str = start.strftime("%m-%d")
+    time_str = start.strftime("%I:%M %p")
+    if all_day or time_str == "12:00 AM":
+        time_str = "Open link for time"
+    return date_str, time_str
+
+
+def feed_window(config):
+    start = date.today()
+    return start, start + timedelta(days=config.get("feed_days", FEED_DAYS))
+
+
+####################
+# TRIBE EVENTS REST
+####################
+
+def map_tribe_event(item):
+    """Map one /wp-json/tribe/events/v1/events record onto the extract_events schema"""
+    start = datetime.strptime(item["start_date"], "%Y-%m-%d %H:%M:%S")
+    event_date, event_time = format_date_and_time(start, item.get("all_day", False))
+    venue = item.get("venue") if isinstance(item.get("venue"), dict) else {}
+    image = item.get("image") if isinstance(item.get("image"), dict) else {}
+    return {
+        'title': html.unescape(item.get("title", "")).strip() or "N/A",
+        'details': strip_html(item.get("excerpt") or item.get("description")),
+        'date': event_date,
+        'time': event_time,
+        'location': html.unescape(venue.get("venue", "")).strip() or "N/A",
+        'url': item.get("url") or "N/A",
+        'image_url': image.get("url") or "N/A",
+    }
+
+
+def fetch_tribe_events(feed_url, start, end, per_page=FEED_PER_PAGE, max_pages=FEED_MAX_PAGES):
+    """Pull every event in the window from a Tribe Events REST endpoint, pages after the first in parallel"""
+    params = {
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+        "per_page": per_page,
+    }
+    first = fetch_json(feed_url, params={**params, "page": 1})
+    if first is None:
+        return None
+
+    total_pages = min(int(first.get("total_pages", 1) or 1), max_pages)
+    pages = [first]
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as executor:
+            pages += executor.map(lambda page: fetch_json(feed_url, params={**params, "page": page}), range(2, total_pages + 1))
+
+    events = []
+    for page_number, page in enumerate(pages, start=1):
+        if page is None:
+            logging.error(f"Missing page {page_number} of {feed_url}")
+            continue
+        for item in page.get("events", []):
+            try:
+                events.append(map_tribe_event(item))
+            except (KeyError, ValueError) as e:
+                logging.error(f"Skipping malformed feed event {item.get('id')}: {e}")
+    logging.info(f"Tribe feed returned {len(events)} events across {total_pages} pages")
+    return events
+
+
+####################
+# ICAL
+####################
+
+def unfold_ical(text):
+    """Join RFC 5545 continuation lines"""
+    return re.sub(r'\r?\n[ \t]', '', text).splitlines()
+
+
+def unescape_ical(value):
+    return value.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\').strip()
+
+
+def parse_ical_datetime(value):
+    if len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d"), True
+    return datetime.strptime(value.rstrip('Z')[:15], "%Y%m%dT%H%M%S"), False
+
+
+def parse_ical_events(text, start=None, end=None):
+    """Map VEVENT blocks onto the extract_events schema, keeping those that start inside the window"""
+    events = []
+    fields = None
+    for line in unfold_ical(text):
+        if line == "BEGIN:VEVENT":
+            fields = {}
+        elif line == "END:VEVENT" and fields is not None:
+            try:
+                event_start, all_day = parse_ical_datetime(fields["DTSTART"])
+            except (KeyError, ValueError) as e:
+                logging.error(f"Skipping iCal event without a usable DTSTART: {e}")
+                fields = None
+                continue
+            if (start and event_start.date() < start) or (end and event_start.date() > end):
+                fields = None
+                continue
+            event_date, event_time = format_date_and_time(event_start, all_day)
+            events.append({
+                'title': unescape_ical(fields.get("SUMMARY", "")) or "N/A",
+                'details': strip_html(unescape_ical(fields.get("DESCRIPTION", ""))),
+                'date': event_date,
+                'time': event_time,
+                'location': unescape_ical(fields.get("LOCATION", "")) or "N/A",
+                'url': fields.get("URL", "N/A"),
+                'image_url': fields.get("ATTACH", "N/A"),
+            })
+            fields = None
+        elif fields is not None and ':' in line:
+            key, value = line.split(':', 1)
+            fields[key.split(';', 1)[0].upper()] = value
+    return events
+
+
+def fetch_ical_events(ical_url, start, end):
+    text = fetch_html(ical_url)
+    if text is None:
+        return None
+    events = parse_ical_events(text, start, end)
+    logging.info(f"iCal feed returned {len(events)} events")
+    return events
+
+
+####################
+# CAPTURED JSON APIS
+####################
+
+def resolve_path(data, path):
+    for key in path:
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and isinstance(key, int) and key < len(data):
+            data = data[key]
+        else:
+            return None
+    return data
+
+
+def parse_api_datetime(value):
+    """A start value from a captured API: ISO-ish strings or epoch seconds/milliseconds"""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        value = int(value)
+        return datetime.fromtimestamp(value / 1000 if value > 10**11 else value), False
+    return parser.parse(value), len(value.strip()) <= 10
+
+
+def map_api_event(record, fields, page_url=''):
+    """Map one captured API record onto the extract_events schema using its guessed field paths"""
+    def field(name):
+        value = resolve_path(record, fields[name]) if name in fields else None
+        return str(value).strip() if value not in (None, '') else "N/A"
+
+    event_date, event_time = format_date_and_time(*parse_api_datetime(resolve_path(record, fields["date"])))
+    url = field('url')
+    if url != "N/A":
+        url = urljoin(page_url, url)  # relative links resolve against the listing page, not the API host
+    return {
+        'title': html.unescape(field('title')),
+        'details': strip_html(field('details')),
+        'date': event_date,
+        'time': event_time,
+        'location': html.unescape(field('location')),
+        'url': url,
+        'image_url': field('image_url'),
+    }
+
+
+def fetch_api_events(spec, page_url=''):
+    """Replay a captured XHR endpoint with plain HTTP"""
+    data = fetch_json(spec["api_url"])
+    if data is None:
+        return None
+    records = resolve_path(data, spec["items_path"])
+    if not isinstance(records, list):
+        logging.error(f"No event array at {spec['items_path']} in {spec['api_url']}; rerun --discover")
+        return None
+    events = []
+    for record in records:
+        try:
+            events.append(map_api_event(record, spec["fields"], page_url))
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            logging.error(f"Skipping malformed API event: {e}")
+    logging.info(f"API source returned {len(events)} events (captured {spec.get('captured', 'unknown')})")
+    return events
+
+
+####################
+# DISPATCH
+####################
+
+def fetch_feed_events(config):
+    """Events for a feed source in SITES, or None when the feed can't be read"""
+    start, end = feed_window(config)
+    source = config.get("source")
+    events = None
+    if source == "tribe_rest":
+        events = fetch_tribe_events(config["feed_url"], start, end)
+        # the iCal export is a slower, single-page fallback for the same calendar
+        if events is None and config.get("ical_url"):
+            events = fetch_ical_events(config["ical_url"], start, end)
+    elif source == "ical":
+        events = fetch_ical_events(config["ical_url"], start, end)
+    elif source == "api":
+        events = fetch_api_events(config["api"], config["url"])
+    return events
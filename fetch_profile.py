@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import threading
+from fnmatch import fnmatchcase
+from urllib.parse import urlparse
+
+####################
+# CONFIGURATION
+####################
+
+# Nothing we extract needs rendered images, fonts or media, only their URLs in the markup.
+# These are URL globs for Network.setBlockedURLs, so resource types are approximated by file extension:
+# blocking by type would need Fetch.enable, whose paused requests must each be answered from a
+# Fetch.requestPaused listener, and execute_cdp_cmd can only send commands, not receive events.
+# Sites whose DOM is built by one of these list its URLs (or a host) in "allow_urls" to keep them.
+BLOCKED_URL_PATTERNS = [
+    # images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    # fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # media
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+    # analytics, ads and trackers
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*quantserve.com*",
+    "*scorecardresearch.com*", "*adservice.google.com*", "*newrelic.com*", "*nr-data.net*",
+]
+
+
+####################
+# REQUEST BLOCKING
+####################
+
+def blocked_patterns(config):
+    """URL patterns to block for a site; "fetch_profile": "full" turns blocking off"""
+    config = config or {}
+    if config.get("fetch_profile") == "full":
+        return []
+    allow = config.get("allow_urls", [])
+    # setBlockedURLs has no exceptions, so any pattern an allowed URL matches (or names its host) is left out
+    return [pattern for pattern in BLOCKED_URL_PATTERNS
+            if not any(fnmatchcase(allowed, pattern) or allowed in pattern for allowed in allow)]
+
+
+def apply_fetch_profile(driver, patterns):
+    """Set (or clear) DevTools request blocking on a pooled session before navigating"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        logging.error(f"Could not apply request blocking: {e}")
+
+
+def drain_network_log(driver):
+    """DevTools Network.* events recorded since the last drain"""
+    events = []
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        logging.error(f"Could not read the performance log: {e}")
+        return events
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if message.get('method', '').startswith('Network.'):
+            events.append(message)
+    return events
+
+
+def transfer_summary(network_events):
+    """Bytes received, requests finished and requests blocked, from a drained network log"""
+    summary = {"bytes": 0, "requests": 0, "blocked": 0}
+    for event in network_events:
+        if event['method'] == 'Network.loadingFinished':
+            summary["bytes"] += event['params'].get('encodedDataLength', 0)
+            summary["requests"] += 1
+        elif event['method'] == 'Network.loadingFailed' and event['params'].get('blockedReason'):
+            summary["blocked"] += 1
+    return summary
+
+
+####################
+# SAVINGS REPORT
+####################
+
+class FetchProfileStats:
+    """Compares blocked fetches against an unblocked baseline kept per site"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.baselines = json.load(f)
+        except (OSError, ValueError):
+            self.baselines = {}
+        self.runs = {}
+
+    def needs_baseline(self, url):
+        return urlparse(url).netloc not in self.baselines
+
+    def record(self, url, blocking, summary, seconds):
+        site = urlparse(url).netloc
+        with self._lock:
+            if not blocking:
+                self.baselines[site] = {"bytes": summary["bytes"], "seconds": seconds}
+                logging.info(f"Unblocked baseline for {site}: {summary['bytes'] / 1024:.0f} KB in {seconds:.1f} s")
+                return
+            run = self.runs.setdefault(site, {"bytes": 0, "seconds": 0.0, "blocked": 0, "pages": 0})
+            run["bytes"] += summary["bytes"]
+            run["seconds"] += seconds
+            run["blocked"] += summary["blocked"]
+            run["pages"] += 1
+        logging.info(f"Fetched {url}: {summary['bytes'] / 1024:.0f} KB in {seconds:.1f} s, {summary['blocked']} requests blocked")
+
+    def report(self):
+        """Log bytes and time saved per site against its baseline, then persist the baselines"""
+        for site, run in self.runs.items():
+            baseline = self.baselines.get(site)
+            if not baseline:
+                continue
+            saved_kb = (baseline["bytes"] * run["pages"] - run["bytes"]) / 1024
+            saved_seconds = baseline["seconds"] * run["pages"] - run["seconds"]
+            logging.info(f"Request blocking on {site}: saved {saved_kb:.0f} KB and {saved_seconds:.1f} s "
+                         f"over {run['pages']} pages ({run['blocked']} requests blocked)")
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.baselines, f, indent=2)
+        except OSError as e:
+            logging.warning(f"Could not save fetch profile baselines: {e}")
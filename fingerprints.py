@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+####################
+# CONFIGURATION
+####################
+
+FINGERPRINT_KEEP_DAYS = 60    # forget events that haven't been seen for this long
+CARRY_FORWARD_DAYS = 7        # unseen events are only carried into the output this long after they were last seen
+
+
+####################
+# FINGERPRINTS
+####################
+
+def normalize_url(url):
+    """Lowercase scheme/host and drop fragments and trailing slashes (kept in step with the scroll script)"""
+    parts = urlsplit(url.strip())
+    normalized = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    return normalized + (f"?{parts.query}" if parts.query else "")
+
+
+def event_fingerprint(source, title, date, url):
+    """The event's URL when it has one, otherwise a hash of title, date and source"""
+    if url and url != "N/A" and url.startswith(('http://', 'https://')):
+        return normalize_url(url)
+    digest = hashlib.sha1(f"{source}|{title}|{date}".encode('utf-8')).hexdigest()
+    return f"sha1:{digest}"
+
+
+class FingerprintStore:
+    """Persisted fingerprints of events seen on earlier runs, with the event record they produced"""
+
+    def __init__(self, path):
+        self.path = path
+        self.today = date.today().isoformat()
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.seen_this_run = set()
+        self.stopped = set()        # sources whose crawl stopped on a run of known events this run
+
+    def known(self, fingerprint):
+        return fingerprint in self.entries
+
+    def get(self, fingerprint):
+        entry = self.entries.get(fingerprint)
+        return dict(entry["event"]) if entry else None
+
+    def known_urls(self):
+        """Normalized event URLs already seen, for the in-page scroll check"""
+        return [fingerprint for fingerprint in self.entries if not fingerprint.startswith("sha1:")]
+
+    def remember(self, fingerprint, source, event):
+        with self._lock:
+            self.entries[fingerprint] = {"source": source, "last_seen": self.today, "event": dict(event)}
+            self.seen_this_run.add(fingerprint)
+
+    def stop_early(self, source):
+        with self._lock:
+            self.stopped.add(source)
+
+    def carry_forward(self, source):
+        """Recently seen events for a source that this run stopped before reaching (none if it wasn't stopped)"""
+        if source not in self.stopped:
+            return []
+        cutoff = (date.today() - timedelta(days=CARRY_FORWARD_DAYS)).isoformat()
+        return [dict(entry["event"]) for fingerprint, entry in self.entries.items()
+                if entry["source"] == source and fingerprint not in self.seen_this_run and entry["last_seen"] >= cutoff]
+
+    def save(self):
+        cutoff = (date.today() - timedelta(days=FINGERPRINT_KEEP_DAYS)).isoformat()
+        self.entries = {fingerprint: entry for fingerprint, entry in self.entries.items() if entry["last_seen"] >= cutoff}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        logging.info(f"Saved {len(self.entries)} event fingerprints ({len(self.seen_this_run)} seen this run)")
@@ -1,17 +1,18 @@
 import os
-import time
+import sys
 import json
 import pandas as pd
 import requests
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import chromedriver_autoinstaller
 from bs4 import BeautifulSoup
 import logging
 
+# Share the browser pool with event_scraper6.py in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_pool import get_browser_pool
+from page_loading import wait_for_content, scroll_until_plateau
+from html_parsers import SOUP_BUILDER, parse_document
+
 # Setup directories
 LOG_FOLDER = 'logs'
 DATA_FOLDER = 'data'
@@ -110,38 +111,25 @@ class AIWebExtractor:
         self.setup_browser()
     
     def setup_browser(self):
-        """Set up the browser for fetching web pages"""
-        chromedriver_autoinstaller.install()
-        options = Options()
-        options.add_argument("--headless")  # Run in headless mode
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        self.driver = webdriver.Chrome(options=options)
+        """Draw browser sessions from the shared pool (headless Chrome)"""
+        self.pool = get_browser_pool()
     
     def fetch_page(self, url):
         """Fetch a web page and return its HTML content"""
+        driver = self.pool.checkout()
         try:
-            self.driver.get(url)
-            time.sleep(5)  # Wait for JavaScript content to load
+            driver.get(url)
+            wait_for_content(driver)  # Wait for JavaScript content and network to settle
             
             # Scroll to load all content
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            scroll_until_plateau(driver)
             
-            html_content = self.driver.page_source
+            html_content = driver.page_source
             
             # Take a screenshot for visual context if using a multimodal model
             screenshot = None
             if "llava" in self.ollama.model:
-                self.driver.save_screenshot("temp_screenshot.png")
+                driver.save_screenshot("temp_screenshot.png")
                 with open("temp_screenshot.png", "rb") as img_file:
                     import base64
                     screenshot = base64.b64encode(img_file.read()).decode('utf-8')
@@ -151,11 +139,13 @@ class AIWebExtractor:
         except Exception as e:
             logging.error(f"Error fetching the page: {e}")
             return None, None
+        finally:
+            self.pool.checkin(driver)
     
     def extract_events(self, html_content, screenshot, site_name, site_url):
         """Extract events from HTML content using AI"""
         # Clean up HTML for easier processing
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, SOUP_BUILDER)
         
         # Remove scripts and styles to reduce token count
         for script in soup(["script", "style"]):
@@ -234,7 +224,8 @@ Here's the HTML content:
         if len(html) <= max_size:
             return [html]
         
-        soup = BeautifulSoup(html, 'html.parser')
+        # only needs element boundaries, so the C parser does it without building a soup
+        soup = parse_document(html, "selectolax")
         chunks = []
         current_chunk = ""
         
@@ -313,9 +304,9 @@ Here's the HTML content:
         return processed
     
     def close(self):
-        """Close the browser"""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        """Close the browser pool"""
+        if hasattr(self, 'pool'):
+            self.pool.close()
 
 def create_all_events_dataframe(all_events):
     """Create a dataframe with all events"""
@@ -0,0 +1,137 @@
+import logging
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401  (only needs to be importable for BeautifulSoup's "lxml" builder)
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    HAVE_SELECTOLAX = False
+
+####################
+# CONFIGURATION
+####################
+
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+SOUP_BUILDER = "lxml" if HAVE_LXML else "html.parser"   # fastest BeautifulSoup tree builder installed
+DEFAULT_BACKEND = SOUP_BUILDER
+
+
+####################
+# SELECTOLAX ADAPTER
+####################
+
+def attrs_to_css(name, attrs):
+    """CSS for a find()/find_all() call, plus the callable matchers CSS can't express"""
+    if isinstance(name, dict):
+        name = list(name)  # a {tag: attrs} selector used as a tag name matches its tag
+    names = name if isinstance(name, (list, tuple)) else [name or '*']
+    conditions = ''
+    matchers = {}
+    for key, value in attrs.items():
+        key = 'class' if key == 'class_' else key
+        if callable(value):
+            matchers[key] = value
+        elif value is True:
+            conditions += f'[{key}]'
+        elif key == 'class' and ' ' not in value:
+            conditions += f'.{value}'
+        else:
+            # multi-class strings match the exact attribute value, as in BeautifulSoup
+            escaped = str(value).replace('"', '\\"')
+            conditions += f'[{key}="{escaped}"]'
+    return ', '.join(f'{tag}{conditions}' for tag in names), matchers
+
+
+class SelectolaxNode:
+    """The slice of the BeautifulSoup Tag API the extract_* functions use, over a lexbor node"""
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return {key: value or '' for key, value in self.node.attributes.items()}
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    def get_text(self, separator='', strip=False):
+        return self.node.text(deep=True, separator=separator, strip=strip)
+
+    @property
+    def stripped_strings(self):
+        for node in self.node.traverse(include_text=True):
+            if node.tag == '-text':
+                text = node.text_content.strip()
+                if text:
+                    yield text
+
+    def find_all(self, name=None, attrs=None, **kwargs):
+        css, matchers = attrs_to_css(name, {**(attrs or {}), **kwargs})
+        found = []
+        for node in self.node.css(css):
+            if node.mem_id == self.node.mem_id:
+                continue  # lexbor matches the node itself, BeautifulSoup only searches descendants
+            node_attrs = node.attributes
+            if all(key in node_attrs and match(node_attrs[key] or '') for key, match in matchers.items()):
+                found.append(SelectolaxNode(node))
+        return found
+
+    def find(self, name=None, attrs=None, **kwargs):
+        found = self.find_all(name, attrs, **kwargs)
+        return found[0] if found else None
+
+    def extract(self):
+        # append() copies, and pages are only merged into a fresh tree, so nothing has to be detached
+        return self
+
+    def append(self, child):
+        self.node.insert_child(child.node)
+
+    def prettify(self):
+        return self.node.html
+
+    def __str__(self):
+        return self.node.html or ''
+
+
+####################
+# PARSING
+####################
+
+def parse_document(html_content, backend=DEFAULT_BACKEND):
+    """Parse a page with the chosen backend; every backend answers the same find/find_all/text calls"""
+    if backend == "selectolax":
+        if HAVE_SELECTOLAX:
+            return SelectolaxNode(LexborHTMLParser(html_content).root)
+        logging.warning("selectolax is not installed, falling back to BeautifulSoup")
+        backend = SOUP_BUILDER
+    if backend == "lxml" and not HAVE_LXML:
+        logging.warning("lxml is not installed, falling back to html.parser")
+        backend = "html.parser"
+    return BeautifulSoup(html_content, backend)
+
+
+def available_backends():
+    return [backend for backend in PARSER_BACKENDS
+            if backend == "html.parser" or (backend == "lxml" and HAVE_LXML) or (backend == "selectolax" and HAVE_SELECTOLAX)]
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+####################
+# CONFIGURATION
+####################
+
+HTTP_TIMEOUT = 15          # seconds per request
+HTTP_POOL_MAXSIZE = 10     # keep-alive connections kept per host
+HOST_RATE = 2.0            # requests per second allowed against one host
+HOST_BURST = 4             # requests a host's bucket can bank while idle
+HOST_CONCURRENCY = 4       # requests in flight at once against one host (the token bucket still paces them)
+MAX_IN_FLIGHT = 4          # requests in flight at once across every host, whichever thread pool they come from
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+####################
+# RATE LIMITING
+####################
+
+class HostRateLimiter:
+    """Per-host token buckets and concurrency caps under one global in-flight budget, shared by HTTP and browser fetches"""
+
+    def __init__(self, rate=HOST_RATE, burst=HOST_BURST, concurrency=HOST_CONCURRENCY, max_in_flight=MAX_IN_FLIGHT):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._buckets = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+        # pagination, feed and enrichment pools all draw from this, so nested pools can't exceed the global cap;
+        # slots are only held around a single request or page load, never while waiting on another slot's work
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def _take_token(self, host):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's concurrency slots and one global slot, and spend one of the host's tokens"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.concurrency))
+        with semaphore:
+            self._take_token(host)
+            with self._in_flight:
+                yield
+
+
+_host_limiter = None
+
+
+def set_host_limiter(limiter):
+    """Install a limiter for every fetch in the process; None turns limiting off"""
+    global _host_limiter
+    _host_limiter = limiter
+
+
+@contextmanager
+def host_slot(url):
+    if _host_limiter is None:
+        yield
+        return
+    with _host_limiter.slot(url):
+        yield
+
+
+####################
+# HTTP CLIENT
+####################
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Process-wide keep-alive session so repeat requests to a host reuse connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(HTTP_HEADERS)
+        return _session
+
+
+def fetch_html(url, timeout=HTTP_TIMEOUT):
+    """Fetch a page's initial HTML without a browser; returns None on failure"""
+    start = time.perf_counter()
+    try:
+        with host_slot(url):
+            response = get_http_session().get(url, timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"HTTP fetch failed for {url}: {e}")
+        return None
+    logging.info(f"HTTP fetched {url} in {(time.perf_counter() - start) * 1000:.0f} ms ({len(response.content)} bytes)")
+    return response.text
+
+
+def fetch_json(url, params=None, timeout=HTTP_TIMEOUT):
+    """Fetch and decode a JSON document; returns None on failure"""
+    start = time.perf_counter()
+    try:
+        with host_slot(url):
+            response = get_http_session().get(url, params=params, timeout=timeout, headers={"Accept": "application/json"})
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        logging.error(f"JSON fetch failed for {url}: {e}")
+        return None
+    logging.info(f"JSON fetched {response.url} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return data
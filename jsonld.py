@@ -0,0 +1,140 @@
+import html
+import json
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+from dateutil import parser
+
+from feeds import format_date_and_time, strip_html
+from html_parsers import SOUP_BUILDER
+
+####################
+# SCHEMA.ORG JSON-LD
+####################
+
+JSONLD_STRAINER = SoupStrainer('script', attrs={'type': 'application/ld+json'})
+
+
+def collect_events(data):
+    """Event objects anywhere in a JSON-LD document (lists, @graph, ItemList wrappers)"""
+    if isinstance(data, list):
+        for entry in data:
+            yield from collect_events(entry)
+        return
+    if not isinstance(data, dict):
+        return
+    types = data.get('@type', [])
+    types = [types] if isinstance(types, str) else types
+    if any(isinstance(t, str) and t.endswith('Event') for t in types):
+        yield data
+    for key in ('@graph', 'itemListElement', 'item', 'subEvent'):
+        if key in data:
+            yield from collect_events(data[key])
+
+
+def read_jsonld_scripts(scripts):
+    """Event objects from the text of application/ld+json scripts, skipping any that aren't valid JSON"""
+    events = []
+    for script in scripts:
+        try:
+            data = json.loads(script or '')
+        except ValueError as e:
+            logging.info(f"Skipping unreadable JSON-LD block: {e}")
+            continue
+        events.extend(collect_events(data))
+    return events
+
+
+def find_jsonld_events(html_content):
+    """Event objects from a page's application/ld+json scripts; only the script tags are parsed"""
+    soup = BeautifulSoup(html_content, SOUP_BUILDER, parse_only=JSONLD_STRAINER)
+    return read_jsonld_scripts(script.string for script in soup.find_all('script'))
+
+
+def first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def text(value):
+    """A field as a string (the first one if it is a list), or None when it holds something else"""
+    value = first(value)
+    if isinstance(value, dict):
+        value = value.get('@value')  # language-tagged strings: {"@value": ..., "@language": ...}
+    return value if isinstance(value, str) else None
+
+
+def jsonld_location(location):
+    location = first(location)
+    if isinstance(location, str):
+        return location.strip() or "N/A"
+    if isinstance(location, dict):
+        name = text(location.get('name'))
+        if name and name.strip():
+            return html.unescape(name).strip()
+        address = first(location.get('address'))
+        if isinstance(address, dict):
+            return text(address.get('streetAddress')) or text(address.get('addressLocality')) or "N/A"
+        if isinstance(address, str):
+            return address
+    return "N/A"
+
+
+def jsonld_image(image):
+    image = first(image)
+    if isinstance(image, dict):
+        image = text(image.get('url')) or text(image.get('contentUrl'))
+    return image if isinstance(image, str) and image else "N/A"
+
+
+def jsonld_price(offers):
+    offers = first(offers)
+    if not isinstance(offers, dict):
+        return "N/A"
+    price = first(offers.get('price', offers.get('lowPrice')))
+    if price in (None, '') or isinstance(price, (dict, list)):
+        return "N/A"
+    try:
+        if float(price) == 0:
+            return "Free"
+    except (TypeError, ValueError):
+        return str(price)
+    currency = text(offers.get('priceCurrency')) or ''
+    return f"{'$' if currency in ('', 'USD') else currency + ' '}{price}"
+
+
+def jsonld_date_and_time(start_date):
+    """Date and time from a startDate, formatted like extract_date_and_time; date-only values get no time"""
+    start_date = text(start_date)
+    if not start_date:
+        return "N/A", "N/A"
+    try:
+        start = parser.parse(start_date)
+    except (ValueError, OverflowError, TypeError):
+        return "N/A", "N/A"
+    return format_date_and_time(start, all_day=len(start_date.strip()) <= 10)
+
+
+def map_jsonld_event(data):
+    """Map a schema.org Event onto the extract_events schema"""
+    event_date, event_time = jsonld_date_and_time(data.get('startDate'))
+    return {
+        'title': html.unescape(text(data.get('name')) or '').strip() or "N/A",
+        'details': strip_html(text(data.get('description'))),
+        'date': event_date,
+        'time': event_time,
+        'location': jsonld_location(data.get('location')),
+        'url': text(data.get('url')) or "N/A",
+        'image_url': jsonld_image(data.get('image')),
+        'price': jsonld_price(data.get('offers')),
+    }
+
+
+def map_jsonld_events(blocks):
+    """map_jsonld_event over every block, skipping (and logging) any block it can't read"""
+    events = []
+    for data in blocks:
+        try:
+            events.append(map_jsonld_event(data))
+        except Exception as e:
+            logging.info(f"Skipping unreadable JSON-LD event {str(data.get('name'))[:60]!r}: {e}")
+    return events
@@ -0,0 +1,236 @@
+import logging
+
+from html_parsers import attrs_to_css
+
+####################
+# CONFIGURATION
+####################
+
+DEFAULT_WAIT_TIMEOUT = 20   # seconds; override per site with "wait_timeout" in SITES
+STABLE_MS = 250             # item count must hold this long before the page counts as ready
+NETWORK_IDLE_MS = 250       # no resource may finish loading for this long
+
+
+####################
+# SELECTORS
+####################
+
+def selector_to_css(selector):
+    """Turn a SITES selector like {"div": {"class": "content grid"}} into the CSS parse_html's selectolax backend uses"""
+    if not selector:
+        return None
+    tag, attrs = next(iter(selector.items()))
+    # callables and other matchers only exist on the BeautifulSoup side, so they are left out
+    css, _ = attrs_to_css(tag, attrs or {})
+    return css
+
+
+####################
+# READINESS
+####################
+
+# Polls inside the page so the whole wait is a single webdriver round trip.
+# Ready means the item count has stopped changing and no resource has finished loading recently.
+READY_SCRIPT = """
+const [containerSel, itemSel, timeoutMs, stableMs, idleMs] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+
+function lastResourceEnd() {
+    return performance.getEntriesByType('resource').reduce((end, e) => Math.max(end, e.responseEnd), 0);
+}
+
+function countItems() {
+    const root = containerSel ? document.querySelector(containerSel) : document;
+    if (!root) return 0;
+    if (!itemSel) return document.readyState === 'complete' ? 1 : 0;
+    return root.querySelectorAll(itemSel).length;
+}
+
+let lastCount = countItems();
+// content that is already there when the page finished loading counts as settled
+let lastChange = document.readyState === 'complete' ? start - stableMs : start;
+
+function poll() {
+    const now = performance.now();
+    const count = countItems();
+    if (count !== lastCount) {
+        lastCount = count;
+        lastChange = now;
+    }
+    const stable = count > 0 && now - lastChange >= stableMs;
+    const idle = now - lastResourceEnd() >= idleMs;
+    if (stable && idle) {
+        return done({ready: true, items: count, elapsed: now - start});
+    }
+    if (now - start >= timeoutMs) {
+        return done({ready: false, items: count, elapsed: now - start});
+    }
+    setTimeout(poll, 50);
+}
+poll();
+"""
+
+
+def wait_for_content(driver, config=None, timeout=None):
+    """Wait until the site's item selector is present and stable, instead of a fixed sleep"""
+    config = config or {}
+    timeout = timeout or config.get("wait_timeout", DEFAULT_WAIT_TIMEOUT)
+    container_css = selector_to_css(config.get("content_list_class"))
+    item_css = selector_to_css(config.get("item_attr"))
+
+    driver.set_script_timeout(timeout + 5)
+    try:
+        result = driver.execute_async_script(
+            READY_SCRIPT, container_css, item_css, timeout * 1000, STABLE_MS, NETWORK_IDLE_MS
+        )
+    except Exception as e:
+        logging.error(f"Readiness wait failed for {driver.current_url}: {e}")
+        return {"ready": False, "items": 0, "elapsed": None}
+
+    if result["ready"]:
+        logging.info(f"Ready after {result['elapsed']:.0f} ms with {result['items']} items: {driver.current_url}")
+    else:
+        logging.warning(f"Gave up waiting after {result['elapsed']:.0f} ms with {result['items']} items: {driver.current_url}")
+    return result
+
+
+####################
+# SCROLLING
+####################
+
+SCROLL_SETTLE_MS = 150      # pause after each viewport step for lazy content to attach
+SCROLL_PLATEAU_ROUNDS = 3   # steps at the bottom without new items before giving up
+SCROLL_MAX_SECONDS = 30
+
+# Scrolls a viewport at a time inside the page, so the whole scroll is a single webdriver round trip.
+# Without an item selector the page height stands in for the item count.
+SCROLL_SCRIPT = """
+const [itemSel, settleMs, plateauRounds, maxMs, knownUrls, knownRunLimit] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+const count = () => itemSel ? document.querySelectorAll(itemSel).length : document.body.scrollHeight;
+
+// same normalization as fingerprints.normalize_url
+const known = new Set(knownUrls || []);
+const normalize = href => {
+    const url = new URL(href, location.href);
+    return url.origin.toLowerCase() + url.pathname.replace(/\\/+$/, '') + url.search;
+};
+let checked = 0;
+let knownRun = 0;
+
+function knownRunReached() {
+    if (!itemSel || !knownRunLimit || !known.size) return false;
+    const items = document.querySelectorAll(itemSel);
+    for (; checked < items.length; checked++) {
+        const link = items[checked].matches('a[href]') ? items[checked] : items[checked].querySelector('a[href]');
+        knownRun = link && known.has(normalize(link.href)) ? knownRun + 1 : 0;
+        if (knownRun >= knownRunLimit) return true;
+    }
+    return false;
+}
+
+let last = count();
+let still = 0;
+let steps = 0;
+
+function step() {
+    window.scrollBy(0, window.innerHeight);
+    steps++;
+    setTimeout(() => {
+        const n = count();
+        const atBottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 2;
+        if (n !== last) {
+            last = n;
+            still = 0;
+        } else if (atBottom) {
+            still++;
+        }
+        const elapsed = performance.now() - start;
+        const stoppedOnKnown = knownRunReached();
+        if ((atBottom && still >= plateauRounds) || stoppedOnKnown || elapsed >= maxMs) {
+            return done({items: itemSel ? n : null, steps: steps, elapsed: elapsed, bottom: atBottom, known: stoppedOnKnown});
+        }
+        step();
+    }, settleMs);
+}
+step();
+"""
+
+
+def scroll_until_plateau(driver, config=None, known_urls=None, known_run_limit=None):
+    """Scroll by viewport until the item count stops growing at the bottom of the page,
+    or until known_run_limit already-known events show up in a row"""
+    config = config or {}
+    if config.get("scroll") is False:
+        logging.info(f"Scroll skipped for {driver.current_url}")
+        return None
+
+    item_css = selector_to_css(config.get("item_attr"))
+    driver.set_script_timeout(SCROLL_MAX_SECONDS + 5)
+    try:
+        result = driver.execute_async_script(
+            SCROLL_SCRIPT, item_css, SCROLL_SETTLE_MS, SCROLL_PLATEAU_ROUNDS, SCROLL_MAX_SECONDS * 1000,
+            known_urls or [], known_run_limit
+        )
+    except Exception as e:
+        logging.error(f"Scroll failed for {driver.current_url}: {e}")
+        return None
+
+    logging.info(f"Scrolled {result['steps']} steps in {result['elapsed']:.0f} ms, {result['items']} items"
+                 f"{' (stopped on known events)' if result['known'] else ''}: {driver.current_url}")
+    return result
+
+
+####################
+# LOAD MORE
+####################
+
+LOAD_MORE_TIMEOUT = 10  # seconds to wait for new items after each click
+
+# Clicks the site's "load more" button inside the page until it disappears, stops adding items, or max_clicks is hit.
+LOAD_MORE_SCRIPT = """
+const [buttonSel, itemSel, maxClicks, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const count = () => itemSel ? document.querySelectorAll(itemSel).length : document.body.scrollHeight;
+let clicks = 0;
+let last = count();
+
+function click() {
+    const button = document.querySelector(buttonSel);
+    if (!button || button.disabled || clicks >= maxClicks) {
+        return done({clicks: clicks, items: last});
+    }
+    button.scrollIntoView({block: 'center'});
+    button.click();
+    clicks++;
+    const start = performance.now();
+    (function waitForGrowth() {
+        const n = count();
+        if (n > last) {
+            last = n;
+            return setTimeout(click, 100);
+        }
+        if (performance.now() - start >= timeoutMs) {
+            return done({clicks: clicks, items: last});
+        }
+        setTimeout(waitForGrowth, 100);
+    })();
+}
+click();
+"""
+
+
+def click_load_more(driver, config, max_clicks):
+    """Press the site's "load more" button until it stops producing new items"""
+    button_css = selector_to_css(config["pagination"]["button"])
+    item_css = selector_to_css(config.get("item_attr"))
+    driver.set_script_timeout(max_clicks * (LOAD_MORE_TIMEOUT + 1) + 5)
+    try:
+        result = driver.execute_async_script(LOAD_MORE_SCRIPT, button_css, item_css, max_clicks, LOAD_MORE_TIMEOUT * 1000)
+    except Exception as e:
+        logging.error(f"Load more failed for {driver.current_url}: {e}")
+        return None
+    logging.info(f"Clicked load more {result['clicks']} times, {result['items']} items: {driver.current_url}")
+    return result
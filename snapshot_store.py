@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+####################
+# CONFIGURATION
+####################
+
+SNAPSHOT_FOLDER = 'snapshots'
+
+
+####################
+# SNAPSHOT STORE
+####################
+
+class SnapshotStore:
+    """Content-addressed, gzipped store of rendered pages plus a manifest per run"""
+
+    def __init__(self, folder=SNAPSHOT_FOLDER):
+        self.folder = folder
+        self.objects = os.path.join(folder, 'objects')
+        self.runs = os.path.join(folder, 'runs')
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.runs, exist_ok=True)
+        self._lock = threading.Lock()
+        self.run = None
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], f"{digest[2:]}.html.gz")
+
+    def put(self, html_content):
+        """Store a page once per distinct content and return its sha256"""
+        data = html_content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def start_run(self):
+        started = datetime.now()
+        self.run = {"run_id": started.strftime("%Y%m%d-%H%M%S"), "started": started.isoformat(timespec='seconds'), "sites": {}}
+        return self.run["run_id"]
+
+    def record_site(self, site_name, url, html_content):
+        """Snapshot every page a site produced this run (paginated sites produce several)"""
+        pages = html_content if isinstance(html_content, list) else [html_content]
+        digests = [self.put(page) for page in pages]
+        with self._lock:
+            self.run["sites"][site_name] = {
+                "url": url,
+                "fetched_at": datetime.now().isoformat(timespec='seconds'),
+                "pages": digests,
+                "bytes": sum(len(page) for page in pages),
+            }
+
+    def save_run(self):
+        with self._lock:
+            with open(os.path.join(self.runs, f"{self.run['run_id']}.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.run, f, indent=2)
+        logging.info(f"Saved snapshot run {self.run['run_id']} with {len(self.run['sites'])} sites")
+
+    def load_run(self, run_id=None):
+        """A run's manifest; the most recent run when run_id is None"""
+        if run_id is None:
+            run_files = sorted(name for name in os.listdir(self.runs) if name.endswith('.json'))
+            if not run_files:
+                raise FileNotFoundError(f"No snapshot runs in {self.runs}")
+            run_id = run_files[-1][:-len('.json')]
+        with open(os.path.join(self.runs, f"{run_id}.json"), encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_site(self, run, site_name):
+        """The stored page(s) for a site in a run, shaped like the fetch stage's output"""
+        site = run["sites"].get(site_name)
+        if not site:
+            return None
+        pages = [self.get(digest) for digest in site["pages"]]
+        return pages if len(pages) > 1 else pages[0]
@@ -0,0 +1,164 @@
+import base64
+import json
+import logging
+import os
+from datetime import date
+
+####################
+# CONFIGURATION
+####################
+
+# Keys tried, in order, when guessing which field of a captured record holds each event column.
+# Matching ignores case, "_" and "-".
+FIELD_KEYS = {
+    'title': ('title', 'name', 'eventname', 'eventtitle', 'headline', 'summary'),
+    'date': ('startdate', 'start', 'starttime', 'startdatetime', 'startsat', 'begins', 'dtstart', 'date', 'datetime', 'when'),
+    'url': ('url', 'link', 'permalink', 'eventurl', 'detailurl', 'href', 'absoluteurl'),
+    'location': ('venue', 'venuename', 'location', 'locationname', 'place', 'address'),
+    'image_url': ('image', 'imageurl', 'images', 'thumbnail', 'thumbnailurl', 'photo', 'picture', 'img', 'media'),
+    'details': ('description', 'excerpt', 'details', 'body', 'content', 'summary'),
+}
+NESTED_KEYS = ('name', 'title', 'url', 'src', 'href', 'rendered', 'text', 'value', 'venue', 'address')
+MAX_DEPTH = 6               # how deep into a response to look for the event array
+MIN_EVENTS = 2              # arrays shorter than this are not worth an API source
+
+
+####################
+# FIELD GUESSING
+####################
+
+def normalize_key(key):
+    return str(key).lower().replace('_', '').replace('-', '')
+
+
+def scalar_path(value, path):
+    """Path to a usable scalar at or just under value (a nested name/url, or the first list entry)"""
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool) and str(value).strip():
+        return path
+    if isinstance(value, list) and value:
+        return scalar_path(value[0], path + [0])
+    if isinstance(value, dict):
+        for key in NESTED_KEYS:
+            if key in value:
+                nested = scalar_path(value[key], path + [key])
+                if nested:
+                    return nested
+    return None
+
+
+def guess_field_path(record, field):
+    keys = {normalize_key(key): key for key in record}
+    for candidate in FIELD_KEYS[field]:
+        if candidate in keys:
+            path = scalar_path(record[keys[candidate]], [keys[candidate]])
+            if path:
+                return path
+    return None
+
+
+def guess_fields(record):
+    """Field name -> key path in one captured record, for every column we could place"""
+    fields = {}
+    for field in FIELD_KEYS:
+        path = guess_field_path(record, field)
+        if path and path not in fields.values():
+            fields[field] = path
+    return fields
+
+
+def find_event_array(data, path=None, depth=0):
+    """(path, records) of the longest list of records that have a title and a start date"""
+    path = path or []
+    best = (None, [])
+    if depth > MAX_DEPTH:
+        return best
+    if isinstance(data, list):
+        records = [entry for entry in data if isinstance(entry, dict)]
+        if records and len(records) >= MIN_EVENTS:
+            fields = guess_fields(records[0])
+            if 'title' in fields and 'date' in fields:
+                best = (path, records)
+        for index, entry in enumerate(data[:1]):
+            nested = find_event_array(entry, path + [index], depth + 1)
+            if len(nested[1]) > len(best[1]):
+                best = nested
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                nested = find_event_array(value, path + [key], depth + 1)
+                if len(nested[1]) > len(best[1]):
+                    best = nested
+    return best
+
+
+####################
+# NETWORK CAPTURE
+####################
+
+def json_responses(network_events):
+    """(request_id, url) of GET XHR/fetch responses with a JSON body, in the order the page loaded them"""
+    methods = {}
+    finished = set()
+    candidates = []
+    for event in network_events:
+        params = event['params']
+        if event['method'] == 'Network.requestWillBeSent':
+            methods[params['requestId']] = params['request'].get('method', 'GET')
+        elif event['method'] == 'Network.loadingFinished':
+            finished.add(params['requestId'])
+        elif event['method'] == 'Network.responseReceived':
+            response = params.get('response', {})
+            if params.get('type') in ('XHR', 'Fetch') and 'json' in response.get('mimeType', ''):
+                candidates.append((params['requestId'], response['url']))
+    # only GETs can be replayed as plain HTTP calls later
+    return [(request_id, url) for request_id, url in candidates
+            if request_id in finished and methods.get(request_id, 'GET') == 'GET']
+
+
+def response_json(driver, request_id):
+    try:
+        body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        text = base64.b64decode(body['body']).decode('utf-8') if body.get('base64Encoded') else body['body']
+        return json.loads(text)
+    except Exception as e:
+        logging.info(f"Could not read response body {request_id}: {e}")
+        return None
+
+
+def find_api_source(driver, network_events):
+    """An API source definition for the JSON response carrying the most events, or None"""
+    best = None
+    for request_id, url in json_responses(network_events):
+        data = response_json(driver, request_id)
+        if data is None:
+            continue
+        items_path, records = find_event_array(data)
+        logging.info(f"Captured {url}: {len(records)} event records")
+        if records and (best is None or len(records) > best[1]):
+            best = ({
+                "source": "api",
+                "api_url": url,
+                "items_path": items_path,
+                "fields": guess_fields(records[0]),
+                "captured": date.today().isoformat(),
+            }, len(records))
+    return best[0] if best else None
+
+
+####################
+# API SOURCE FILE
+####################
+
+def load_api_sources(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_api_sources(path, sources):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(sources, f, indent=2)
+    logging.info(f"Saved {len(sources)} API sources to {path}")